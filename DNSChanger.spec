@@ -31,6 +31,9 @@ a = Analysis(
         'core.migration',
         'ps',
         'ps.ps_adapter',
+        'ps.ps_session',
+        'ps.iphlpapi',
+        'ps.dnsapi',
         'ps.doh_manager',
         'ui',
         'ui.main_window',
@@ -47,20 +50,19 @@ a = Analysis(
 
 pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
 
+# Build one-folder (COLLECT) instead of one-file: a one-file exe re-extracts the
+# whole runtime to a temp dir on every launch. UPX is disabled for the same
+# reason, since compressed binaries are decompressed at each start.
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.zipfiles,
-    a.datas,
     [],
+    exclude_binaries=True,
     name='DNSChanger',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
+    upx=False,
     console=False,
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -69,3 +71,14 @@ exe = EXE(
     entitlements_file=None,
     uac_admin=True,
 )
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='DNSChanger',
+)
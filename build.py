@@ -1,10 +1,28 @@
 """Build script for DNSChanger."""
 
+import os
 import sys
 import subprocess
 import shutil
+import tempfile
 from pathlib import Path
 
+# Directories never descended into while sweeping __pycache__
+PRUNE_DIRS = {".git", "build", "dist", "release"}
+
+
+def _iter_pycache(root):
+    """Yield __pycache__ directories below root without descending into them."""
+    with os.scandir(root) as it:
+        for entry in it:
+            if not entry.is_dir(follow_symlinks=False) or entry.name in PRUNE_DIRS:
+                continue
+            if entry.name == "__pycache__":
+                yield entry.path
+            else:
+                yield from _iter_pycache(entry.path)
+
+
 def clean_build():
     """Clean build directories."""
     print("Cleaning build directories...")
@@ -17,32 +35,85 @@ def clean_build():
             print(f"  Removed {dir_name}/")
     
     # Clean pycache in subdirectories
-    for pycache in Path(".").rglob("__pycache__"):
+    for pycache in list(_iter_pycache(".")):
         shutil.rmtree(pycache)
         print(f"  Removed {pycache}")
     
     print("✓ Clean complete\n")
 
 
+PYINSTALLER_CMD = ["pyinstaller", "DNSChanger.spec"]
+
+NUITKA_CMD = [
+    "python", "-m", "nuitka",
+    "--standalone",
+    "--onefile",
+    "--windows-console-mode=disable",
+    "--enable-plugin=tk-inter",
+    "--windows-uac-admin",
+    "--lto=yes",
+    "--clang",
+    "--python-flag=no_site",
+    "--python-flag=no_asserts",
+    "--noinclude-pytest-mode=nofollow",
+    "--noinclude-setuptools-mode=nofollow",
+    "--onefile-tempdir-spec={TEMP}\\DNSChanger_{PID}",
+    "--remove-output",
+    "--output-filename=DNSChanger.exe",
+    "dns_changer.py"
+]
+
+# builder name -> (label, command, executable path, install hint)
+BUILDERS = {
+    "pyinstaller": (
+        "PyInstaller", PYINSTALLER_CMD, "dist/DNSChanger/DNSChanger.exe",
+        "pip install pyinstaller"
+    ),
+    "nuitka": (
+        "Nuitka", NUITKA_CMD, "DNSChanger.exe",
+        "pip install nuitka ordered-set"
+    ),
+}
+
+
+def start_build(builder_name, output=None):
+    """
+    Start a build in the background.
+    
+    Returns the running Popen, or None if the builder is not installed.
+    """
+    label, cmd, _, install_hint = BUILDERS[builder_name]
+    
+    try:
+        return subprocess.Popen(cmd, stdout=output, stderr=subprocess.STDOUT if output else None)
+    except FileNotFoundError:
+        print(f"\n✗ {label} not found. Install with: {install_hint}")
+        return None
+
+
+def finish_build(builder_name, process):
+    """Wait for a build started with start_build and report the result."""
+    label, _, exe_path, _ = BUILDERS[builder_name]
+    
+    if process is None:
+        return False
+    
+    returncode = process.wait()
+    if returncode != 0:
+        print(f"\n✗ {label} build failed: exit code {returncode}")
+        return False
+    
+    print(f"\n✓ {label} build complete")
+    print(f"  Executable: {exe_path}")
+    return True
+
+
 def build_pyinstaller():
     """Build using PyInstaller."""
     print("Building with PyInstaller...")
     print("=" * 60)
     
-    try:
-        subprocess.run(
-            ["pyinstaller", "DNSChanger.spec"],
-            check=True
-        )
-        print("\n✓ PyInstaller build complete")
-        print(f"  Executable: dist/DNSChanger.exe")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"\n✗ PyInstaller build failed: {e}")
-        return False
-    except FileNotFoundError:
-        print("\n✗ PyInstaller not found. Install with: pip install pyinstaller")
-        return False
+    return finish_build("pyinstaller", start_build("pyinstaller"))
 
 
 def build_nuitka():
@@ -51,46 +122,63 @@ def build_nuitka():
     print("=" * 60)
     print("Note: This may take 10-15 minutes...")
     
-    cmd = [
-        "python", "-m", "nuitka",
-        "--standalone",
-        "--onefile",
-        "--windows-console-mode=disable",
-        "--enable-plugin=tk-inter",
-        "--windows-uac-admin",
-        "--output-filename=DNSChanger.exe",
-        "dns_changer.py"
-    ]
+    return finish_build("nuitka", start_build("nuitka"))
+
+
+def build_all():
+    """Build with PyInstaller and Nuitka concurrently."""
+    print("Building with PyInstaller and Nuitka in parallel...")
+    print("=" * 60)
+    print("Note: This may take 10-15 minutes...")
     
-    try:
-        subprocess.run(cmd, check=True)
-        print("\n✓ Nuitka build complete")
-        print(f"  Executable: DNSChanger.exe")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"\n✗ Nuitka build failed: {e}")
-        return False
-    except FileNotFoundError:
-        print("\n✗ Nuitka not found. Install with: pip install nuitka ordered-set")
-        return False
+    # Each build logs to its own temp file so their output doesn't interleave
+    running = []
+    for builder_name in BUILDERS:
+        log = tempfile.TemporaryFile()
+        running.append((builder_name, start_build(builder_name, log), log))
+    
+    # Package in the same order as the sequential build did
+    for builder_name, process, log in running:
+        with log:
+            if process is not None:
+                process.wait()
+            log.seek(0)
+            output = log.read().decode("utf-8", errors="replace")
+        
+        if output:
+            print("\n" + "=" * 60)
+            print(f"{BUILDERS[builder_name][0]} output:")
+            print("=" * 60)
+            print(output)
+        
+        if finish_build(builder_name, process):
+            create_release_package(builder_name)
 
 
 def create_release_package(builder_name):
     """Create release package with necessary files."""
-    print(f"\nCreating release package...")
-    
-    release_dir = Path("release")
-    release_dir.mkdir(exist_ok=True)
-    
-    # Copy exe
+    print(f"\nCreating {BUILDERS[builder_name][0]} release package...")
+    
+    # One directory per builder: the PyInstaller folder bundle and the Nuitka one-file
+    # exe share a name, and "all" packages both; start clean so no stale files mix in
+    release_dir = Path("release") / builder_name
+    if release_dir.exists():
+        shutil.rmtree(release_dir)
+    release_dir.mkdir(parents=True)
+    
+    # Copy exe (PyInstaller builds a folder: the exe plus its runtime files).
+    # copyfile skips copy2's metadata pass and uses the OS fast-copy path
+    # (sendfile / fcopyfile / CopyFile2); the release bundle needs no mode bits
     if builder_name == "pyinstaller":
-        exe_src = Path("dist/DNSChanger.exe")
+        bundle_dir = Path("dist/DNSChanger")
+        if bundle_dir.exists():
+            shutil.copytree(bundle_dir, release_dir, dirs_exist_ok=True, copy_function=shutil.copyfile)
+            print(f"  Copied {bundle_dir}")
     else:
         exe_src = Path("DNSChanger.exe")
-    
-    if exe_src.exists():
-        shutil.copy2(exe_src, release_dir / "DNSChanger.exe")
-        print(f"  Copied DNSChanger.exe")
+        if exe_src.exists():
+            shutil.copyfile(exe_src, release_dir / "DNSChanger.exe")
+            print(f"  Copied DNSChanger.exe")
     
     # Copy configuration and docs
     files_to_copy = [
@@ -102,7 +190,7 @@ def create_release_package(builder_name):
     for filename in files_to_copy:
         src = Path(filename)
         if src.exists():
-            shutil.copy2(src, release_dir / filename)
+            shutil.copyfile(src, release_dir / filename)
             print(f"  Copied {filename}")
     
     print(f"\n✓ Release package created in: {release_dir.absolute()}")
@@ -139,18 +227,7 @@ def main():
     
     elif command == "all":
         clean_build()
-        
-        print("\n" + "=" * 60)
-        print("Building with PyInstaller...")
-        print("=" * 60)
-        if build_pyinstaller():
-            create_release_package("pyinstaller")
-        
-        print("\n" + "=" * 60)
-        print("Building with Nuitka...")
-        print("=" * 60)
-        if build_nuitka():
-            create_release_package("nuitka")
+        build_all()
     
     else:
         print(f"Unknown command: {command}")
@@ -1,14 +1,47 @@
 """DNS provider loader with YAML/JSON support and backward compatibility."""
 
+from __future__ import annotations
+
 import os
-import yaml
+import mmap
 import json
+import hashlib
 import logging
-from typing import Optional, Dict, Any, List
+import time
+from collections import OrderedDict, defaultdict
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Union
 from pathlib import Path
-from pydantic import ValidationError
 
-from models.dns_provider import DNSProvider, DNSProviderList
+# yaml, pydantic and the models are imported on first use to keep startup fast
+if TYPE_CHECKING:
+    from pydantic import ValidationError
+    from models.dns_provider import DNSProvider
+
+
+@lru_cache(maxsize=None)
+def _yaml_support():
+    """Import PyYAML and pick the libyaml-backed C loader/dumper when available."""
+    import yaml
+    try:
+        from yaml import CSafeLoader as loader, CSafeDumper as dumper
+    except ImportError:
+        from yaml import SafeLoader as loader, SafeDumper as dumper
+    return yaml, loader, dumper
+
+
+@lru_cache(maxsize=None)
+def _provider_list_adapter():
+    """Build the DNSProviderList TypeAdapter once, on first validation."""
+    from pydantic import TypeAdapter
+    from models.dns_provider import DNSProviderList
+    return TypeAdapter(DNSProviderList)
+
+
+# Sidecar cache format; bump whenever DNSProvider/DNSPolicy fields change, since cached
+# entries are rebuilt with model_construct and skip validation
+_CACHE_SCHEMA_VERSION = 3
+
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +52,18 @@ class DNSLoader:
     DEFAULT_YAML_FILE = "dns_providers.yaml"
     DEFAULT_JSON_FILE = "dns_providers.json"
     LEGACY_TXT_FILE = "dns_list.txt"
+    CACHE_SUFFIX = ".cache"
+    
+    # Files at least this large are parsed from a read-only memory map (bytes)
+    MMAP_THRESHOLD = 4096
+    
+    # How long a config_dir listing is reused by has_*_file() checks (seconds)
+    SCAN_TTL = 1.0
+    
+    # Validated provider lists kept in memory for reloads of unchanged files,
+    # shared by all loaders: {content key: providers}, least recently used first
+    MEMO_SIZE = 4
+    _memo: "OrderedDict[tuple, List[DNSProvider]]" = OrderedDict()
     
     def __init__(self, config_dir: Optional[Path] = None):
         """
@@ -30,6 +75,9 @@ class DNSLoader:
         self.config_dir = Path(config_dir) if config_dir else Path.cwd()
         self.providers: List[DNSProvider] = []
         self.errors: List[str] = []
+        self._set_providers([])
+        self._scan_names: frozenset = frozenset()
+        self._scan_time: Optional[float] = None
         
     def load_providers(self, prefer_yaml: bool = True) -> List[DNSProvider]:
         """
@@ -41,27 +89,24 @@ class DNSLoader:
         Returns:
             List of validated DNS providers
         """
-        self.providers = []
+        self._set_providers([])
         self.errors = []
         
-        yaml_path = self.config_dir / self.DEFAULT_YAML_FILE
-        json_path = self.config_dir / self.DEFAULT_JSON_FILE
+        names = self._scan_config_dir()
+        has_yaml = self.DEFAULT_YAML_FILE in names
+        has_json = self.DEFAULT_JSON_FILE in names
         
-        # Try loading YAML first
-        if prefer_yaml and yaml_path.exists():
+        # YAML wins when preferred or when it is the only file present
+        if has_yaml and (prefer_yaml or not has_json):
+            yaml_path = self.config_dir / self.DEFAULT_YAML_FILE
             logger.info(f"Loading DNS providers from {yaml_path}")
             return self._load_yaml(yaml_path)
         
-        # Try JSON as fallback
-        if json_path.exists():
+        if has_json:
+            json_path = self.config_dir / self.DEFAULT_JSON_FILE
             logger.info(f"Loading DNS providers from {json_path}")
             return self._load_json(json_path)
         
-        # Try YAML even if not preferred
-        if yaml_path.exists():
-            logger.info(f"Loading DNS providers from {yaml_path}")
-            return self._load_yaml(yaml_path)
-        
         # No structured file found
         logger.warning("No dns_providers.yaml or dns_providers.json found")
         self.errors.append(
@@ -70,17 +115,57 @@ class DNSLoader:
         )
         return []
     
+    def _scan_config_dir(self) -> frozenset:
+        """List regular file names in config_dir with a single scandir pass."""
+        try:
+            with os.scandir(self.config_dir) as it:
+                self._scan_names = frozenset(entry.name for entry in it if entry.is_file())
+        except OSError:
+            self._scan_names = frozenset()
+        
+        self._scan_time = time.monotonic()
+        return self._scan_names
+    
+    def _config_names(self) -> frozenset:
+        """Get config_dir file names, rescanning once the listing is older than SCAN_TTL."""
+        if self._scan_time is None or time.monotonic() - self._scan_time > self.SCAN_TTL:
+            return self._scan_config_dir()
+        return self._scan_names
+    
     def _load_yaml(self, file_path: Path) -> List[DNSProvider]:
         """Load and validate providers from YAML file."""
+        yaml, yaml_loader, _ = _yaml_support()
+        
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
+            st = file_path.stat()
+            cache_key = [_CACHE_SCHEMA_VERSION, st.st_mtime_ns, st.st_size]
+            memo_key = ('yaml', os.path.abspath(file_path), *cache_key)
+            
+            cached = self._memo_get(memo_key)
+            if cached is None:
+                cached = self._read_cache(file_path, cache_key)
+            if cached is not None:
+                self._memo_put(memo_key, cached)
+                self._set_providers(list(cached))
+                logger.info(f"Loaded {len(self.providers)} DNS providers from cache for {file_path}")
+                return self.providers
+            
+            with open(file_path, 'rb') as f:
+                if st.st_size >= self.MMAP_THRESHOLD:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        data = yaml.load(mm, Loader=yaml_loader)
+                else:
+                    data = yaml.load(f, Loader=yaml_loader)
             
             if not data:
                 self.errors.append(f"Empty or invalid YAML file: {file_path}")
                 return []
             
-            return self._validate_and_load(data, file_path)
+            providers = self._validate_and_load(data, file_path)
+            if providers:
+                self._memo_put(memo_key, providers)
+                self._write_cache(file_path, cache_key, providers)
+            return providers
             
         except yaml.YAMLError as e:
             error_msg = f"YAML syntax error in {file_path}: {e}"
@@ -98,19 +183,76 @@ class DNSLoader:
             self.errors.append(error_msg)
             return []
     
+    @classmethod
+    def _memo_get(cls, key: tuple) -> Optional[List[DNSProvider]]:
+        """Return providers validated earlier for the same content, if still memoized."""
+        providers = cls._memo.get(key)
+        if providers is not None:
+            cls._memo.move_to_end(key)
+        return providers
+    
+    @classmethod
+    def _memo_put(cls, key: tuple, providers: List[DNSProvider]) -> None:
+        """Memoize validated providers, evicting the least recently used entry."""
+        cls._memo[key] = list(providers)
+        cls._memo.move_to_end(key)
+        while len(cls._memo) > cls.MEMO_SIZE:
+            cls._memo.popitem(last=False)
+    
+    def _cache_path(self, file_path: Path) -> Path:
+        """Get the sidecar cache path for a configuration file."""
+        return file_path.with_name(file_path.name + self.CACHE_SUFFIX)
+    
+    def _read_cache(self, file_path: Path, cache_key: list) -> Optional[List[DNSProvider]]:
+        """Return cached providers if the sidecar cache matches cache_key."""
+        cache_path = self._cache_path(file_path)
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = json.loads(f.read())
+            if cached.get('key') != cache_key:
+                return None
+            
+            # Plain data validated when the cache was written under this same schema
+            from models.dns_provider import DNSProvider, DNSPolicy
+            return [
+                DNSProvider.model_construct(**{**item, 'policy': DNSPolicy.model_construct(**item['policy'])})
+                for item in cached['providers']
+            ]
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug(f"Ignoring unreadable cache {cache_path}: {e}")
+            return None
+    
+    def _write_cache(self, file_path: Path, cache_key: list, providers: List[DNSProvider]) -> None:
+        """Store validated providers in the sidecar cache (best effort)."""
+        cache_path = self._cache_path(file_path)
+        try:
+            # JSON, not pickle: the app runs elevated and loading a pickle could run code
+            data = {'key': cache_key, 'providers': [provider.model_dump(mode='json') for provider in providers]}
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(',', ':'))
+        except Exception as e:
+            logger.debug(f"Could not write cache {cache_path}: {e}")
+    
     def _load_json(self, file_path: Path) -> List[DNSProvider]:
         """Load and validate providers from JSON file."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            raw = file_path.read_bytes()
+            memo_key = ('json', hashlib.blake2b(raw, digest_size=16).digest())
             
-            return self._validate_and_load(data, file_path)
+            cached = self._memo_get(memo_key)
+            if cached is not None:
+                self._set_providers(list(cached))
+                logger.info(f"Loaded {len(self.providers)} DNS providers from memory for {file_path}")
+                return self.providers
+            
+            # pydantic-core parses and validates the raw bytes in a single pass
+            providers = self._validate_and_load(raw, file_path, is_json=True)
+            if providers:
+                self._memo_put(memo_key, providers)
+            return providers
             
-        except json.JSONDecodeError as e:
-            error_msg = f"JSON syntax error in {file_path}: {e}"
-            logger.error(error_msg)
-            self.errors.append(error_msg)
-            return []
         except FileNotFoundError:
             error_msg = f"File not found: {file_path}"
             logger.error(error_msg)
@@ -122,20 +264,55 @@ class DNSLoader:
             self.errors.append(error_msg)
             return []
     
-    def _validate_and_load(self, data: Dict[str, Any], file_path: Path) -> List[DNSProvider]:
-        """Validate data against schema and load providers."""
+    def _validate_and_load(
+        self,
+        data: Union[Dict[str, Any], bytes],
+        file_path: Path,
+        is_json: bool = False
+    ) -> List[DNSProvider]:
+        """
+        Validate data against schema and load providers.
+        
+        Args:
+            data: Parsed configuration, or raw JSON bytes when is_json is True
+            file_path: Source file, used in log and error messages
+            is_json: Parse and validate data as JSON in one pass
+        """
+        from pydantic import ValidationError
+        
+        adapter = _provider_list_adapter()
         try:
-            provider_list = DNSProviderList(**data)
-            self.providers = provider_list.providers
+            if is_json:
+                provider_list = adapter.validate_json(data)
+            else:
+                provider_list = adapter.validate_python(data)
+            self._set_providers(provider_list.providers)
             logger.info(f"Successfully loaded {len(self.providers)} DNS providers from {file_path}")
             return self.providers
             
         except ValidationError as e:
-            error_msg = self._format_validation_error(e, file_path)
+            if is_json and e.errors()[0]['type'] == 'json_invalid':
+                error_msg = f"JSON syntax error in {file_path}: {e.errors()[0]['msg']}"
+            else:
+                error_msg = self._format_validation_error(e, file_path)
             logger.error(error_msg)
             self.errors.append(error_msg)
             return []
     
+    def _set_providers(self, providers: List[DNSProvider]) -> None:
+        """Store loaded providers and rebuild the lookup indexes."""
+        self.providers = providers
+        self._by_name: Dict[str, DNSProvider] = {}
+        self._by_tag: Dict[str, List[DNSProvider]] = defaultdict(list)
+        
+        for provider in providers:
+            self._by_name.setdefault(provider.name, provider)
+            # frozenset so a provider listing a tag twice is indexed only once
+            for tag in frozenset(provider.tags):
+                self._by_tag[tag].append(provider)
+        
+        self._doh_providers = [p for p in providers if p.doh_template is not None]
+    
     def _format_validation_error(self, error: ValidationError, file_path: Path) -> str:
         """Format Pydantic validation errors in a user-friendly way."""
         error_lines = [f"Validation errors in {file_path}:"]
@@ -149,11 +326,11 @@ class DNSLoader:
     
     def has_legacy_file(self) -> bool:
         """Check if legacy dns_list.txt exists."""
-        return (self.config_dir / self.LEGACY_TXT_FILE).exists()
+        return self.LEGACY_TXT_FILE in self._config_names()
     
     def has_yaml_file(self) -> bool:
         """Check if dns_providers.yaml exists."""
-        return (self.config_dir / self.DEFAULT_YAML_FILE).exists()
+        return self.DEFAULT_YAML_FILE in self._config_names()
     
     def get_errors(self) -> List[str]:
         """Get list of loading errors."""
@@ -161,18 +338,15 @@ class DNSLoader:
     
     def get_providers_by_tag(self, tag: str) -> List[DNSProvider]:
         """Get providers filtered by tag."""
-        return [p for p in self.providers if tag in p.tags]
+        return list(self._by_tag.get(tag, ()))
     
     def get_provider_by_name(self, name: str) -> Optional[DNSProvider]:
         """Get provider by exact name match."""
-        for provider in self.providers:
-            if provider.name == name:
-                return provider
-        return None
+        return self._by_name.get(name)
     
     def get_doh_providers(self) -> List[DNSProvider]:
         """Get only providers that support DoH."""
-        return [p for p in self.providers if p.doh_template is not None]
+        return list(self._doh_providers)
     
     def export_to_yaml(self, output_path: Path, providers: Optional[List[DNSProvider]] = None) -> bool:
         """
@@ -192,12 +366,21 @@ class DNSLoader:
             logger.warning("No providers to export")
             return False
         
+        yaml, _, yaml_dumper = _yaml_support()
+        from models.dns_provider import DNSProviderList
+        
         try:
             provider_list = DNSProviderList(version=1, providers=providers)
             data = provider_list.model_dump(mode='python', exclude_none=True)
             
-            with open(output_path, 'w', encoding='utf-8') as f:
-                yaml.dump(data, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
+            # Written aside and swapped in, so a failed export never leaves a truncated file
+            tmp_path = Path(f"{output_path}.tmp")
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    yaml.dump(data, f, Dumper=yaml_dumper, default_flow_style=False, sort_keys=False, allow_unicode=True)
+                os.replace(tmp_path, output_path)
+            finally:
+                tmp_path.unlink(missing_ok=True)
             
             logger.info(f"Successfully exported {len(providers)} providers to {output_path}")
             return True
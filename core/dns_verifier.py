@@ -1,13 +1,20 @@
 """DNS verification and rollback functionality."""
 
 import logging
+import re
+import subprocess
 import time
-from typing import List, Optional, Tuple, Dict
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence, Tuple, Dict
+from dataclasses import dataclass, field
 from enum import Enum
 
 logger = logging.getLogger(__name__)
 
+# Failures that mean the resolver did not answer in time: the adapter's own timeout
+# ("Command timed out after N seconds") or Resolve-DnsName's ERROR_TIMEOUT text
+_TIMEOUT_RE = re.compile(r"timed out|timeout period expired", re.IGNORECASE)
+
 
 class VerificationStatus(Enum):
     """DNS verification status."""
@@ -17,7 +24,7 @@ class VerificationStatus(Enum):
     PARTIAL = "partial"
 
 
-@dataclass
+@dataclass(slots=True)
 class VerificationResult:
     """Result of DNS verification."""
     status: VerificationStatus
@@ -25,6 +32,11 @@ class VerificationResult:
     failed_domains: List[str]
     errors: List[str]
     duration_ms: float
+    total: int = field(init=False)
+    
+    def __post_init__(self):
+        """Precompute the number of tested domains."""
+        self.total = len(self.successful_domains) + len(self.failed_domains)
     
     @property
     def is_successful(self) -> bool:
@@ -34,17 +46,16 @@ class VerificationResult:
     @property
     def success_rate(self) -> float:
         """Calculate success rate."""
-        total = len(self.successful_domains) + len(self.failed_domains)
-        if total == 0:
+        if self.total == 0:
             return 0.0
-        return len(self.successful_domains) / total
+        return len(self.successful_domains) / self.total
         
     def __str__(self) -> str:
         """String representation showing status and duration."""
-        return f"Status: {self.status.value}, Success: {len(self.successful_domains)}/{len(self.successful_domains)+len(self.failed_domains)}, Time: {self.duration_ms:.1f}ms"
+        return f"Status: {self.status.value}, Success: {len(self.successful_domains)}/{self.total}, Time: {self.duration_ms:.1f}ms"
 
 
-@dataclass
+@dataclass(slots=True)
 class DNSSnapshot:
     """Snapshot of DNS configuration for rollback."""
     interface_index: str
@@ -58,11 +69,11 @@ class DNSVerifier:
     """Handles DNS verification and rollback operations."""
     
     # Test domains for verification
-    DEFAULT_TEST_DOMAINS = [
+    DEFAULT_TEST_DOMAINS = (
         "example.com",
         "google.com",
         "cloudflare.com"
-    ]
+    )
     
     # Timeout for DNS resolution (seconds)
     DEFAULT_TIMEOUT = 5
@@ -90,23 +101,47 @@ class DNSVerifier:
         """
         try:
             dns_servers = self.ps_adapter.get_dns_servers(interface_index)
-            is_dhcp = len(dns_servers) == 0
-            
-            snapshot = DNSSnapshot(
-                interface_index=interface_index,
-                interface_name=interface_name,
-                dns_servers=dns_servers if not is_dhcp else [],
-                is_dhcp=is_dhcp,
-                timestamp=time.time()
-            )
-            
-            self.snapshots[interface_index] = snapshot
-            logger.info(f"Created DNS snapshot for interface {interface_name} (index: {interface_index})")
-            return True
-            
         except Exception as e:
             logger.error(f"Failed to create snapshot for interface {interface_index}: {e}")
             return False
+        
+        self._store_snapshot(interface_index, interface_name, dns_servers)
+        return True
+    
+    def create_snapshots(self, interfaces: Sequence[Tuple[str, str]]) -> bool:
+        """
+        Create snapshots for several interfaces from one bulk DNS query.
+        
+        Args:
+            interfaces: (interface_index, interface_name) pairs
+            
+        Returns:
+            True if all snapshots were created
+        """
+        try:
+            dns_by_index = self.ps_adapter.get_dns_servers_bulk([index for index, _ in interfaces])
+        except Exception as e:
+            logger.error(f"Failed to create snapshots for {len(interfaces)} interface(s): {e}")
+            return False
+        
+        for interface_index, interface_name in interfaces:
+            self._store_snapshot(interface_index, interface_name, dns_by_index.get(str(interface_index), []))
+        return True
+    
+    def _store_snapshot(self, interface_index: str, interface_name: str, dns_servers: List[str]) -> None:
+        """Record the DNS configuration of an interface as its rollback snapshot."""
+        is_dhcp = len(dns_servers) == 0
+        
+        snapshot = DNSSnapshot(
+            interface_index=interface_index,
+            interface_name=interface_name,
+            dns_servers=dns_servers if not is_dhcp else [],
+            is_dhcp=is_dhcp,
+            timestamp=time.time()
+        )
+        
+        self.snapshots[interface_index] = snapshot
+        logger.info(f"Created DNS snapshot for interface {interface_name} (index: {interface_index})")
     
     def rollback(self, interface_index: str) -> Tuple[bool, str]:
         """
@@ -152,7 +187,7 @@ class DNSVerifier:
     
     def verify_dns(
         self,
-        test_domains: Optional[List[str]] = None,
+        test_domains: Optional[Sequence[str]] = None,
         timeout: int = DEFAULT_TIMEOUT
     ) -> VerificationResult:
         """
@@ -169,36 +204,57 @@ class DNSVerifier:
             test_domains = self.DEFAULT_TEST_DOMAINS
         
         start_time = time.time()
-        successful_domains = []
-        failed_domains = []
-        errors = []
         
-        for domain in test_domains:
+        # Resolutions are independent and I/O bound, so run them concurrently
+        futures = []
+        if test_domains:
+            with ThreadPoolExecutor(max_workers=len(test_domains)) as executor:
+                futures = [
+                    (domain, executor.submit(self.ps_adapter.resolve_dns, domain, timeout=timeout))
+                    for domain in test_domains
+                ]
+        
+        # Record (success, domain, error) in submission order so results stay deterministic
+        results = []
+        timeouts = 0
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        for domain, future in futures:
             try:
-                success, error = self.ps_adapter.resolve_dns(domain, timeout=timeout)
+                success, error = future.result()
                 
                 if success:
-                    successful_domains.append(domain)
-                    logger.debug(f"Successfully resolved {domain}")
+                    if debug_enabled:
+                        logger.debug(f"Successfully resolved {domain}")
                 else:
-                    failed_domains.append(domain)
-                    errors.append(f"{domain}: {error}")
                     logger.warning(f"Failed to resolve {domain}: {error}")
+                    if _TIMEOUT_RE.search(error or ""):
+                        timeouts += 1
                     
+            except (subprocess.TimeoutExpired, TimeoutError) as e:
+                success, error = False, str(e)
+                timeouts += 1
+                logger.warning(f"Timed out resolving {domain}: {e}")
             except Exception as e:
-                failed_domains.append(domain)
-                error_msg = f"{domain}: {str(e)}"
-                errors.append(error_msg)
+                success, error = False, str(e)
                 logger.error(f"Error resolving {domain}: {e}")
+            
+            results.append((success, domain, error))
+        
+        successful_domains = [domain for ok, domain, _ in results if ok]
+        failed_domains = [domain for ok, domain, _ in results if not ok]
+        errors = [f"{domain}: {error}" for ok, domain, error in results if not ok]
         
         duration_ms = (time.time() - start_time) * 1000
         
-        # Determine status
-        if len(successful_domains) == len(test_domains):
+        # Determine status; the lookups overlap, so elapsed time says nothing about
+        # timeouts and each failure is classified on its own instead
+        ok = len(successful_domains)
+        total = len(test_domains)
+        if ok == total:
             status = VerificationStatus.SUCCESS
-        elif len(successful_domains) > 0:
+        elif ok:
             status = VerificationStatus.PARTIAL
-        elif duration_ms > (timeout * 1000 * len(test_domains)):
+        elif timeouts == total:
             status = VerificationStatus.TIMEOUT
         else:
             status = VerificationStatus.FAILED
@@ -213,7 +269,7 @@ class DNSVerifier:
         
         logger.info(
             f"DNS verification completed: {status.value} "
-            f"({len(successful_domains)}/{len(test_domains)} successful)"
+            f"({ok}/{total} successful)"
         )
         
         return result
@@ -221,7 +277,7 @@ class DNSVerifier:
     def verify_and_rollback_on_failure(
         self,
         interface_index: str,
-        test_domains: Optional[List[str]] = None,
+        test_domains: Optional[Sequence[str]] = None,
         timeout: int = DEFAULT_TIMEOUT,
         success_threshold: float = 0.5
     ) -> Tuple[bool, VerificationResult, Optional[str]]:
@@ -1,6 +1,9 @@
 """Migration utility to convert legacy dns_list.txt to YAML format."""
 
+import csv
 import logging
+import os
+import re
 from pathlib import Path
 from typing import List, Tuple
 
@@ -8,6 +11,49 @@ from models.dns_provider import DNSProvider, DNSPolicy
 
 logger = logging.getLogger(__name__)
 
+# Known DoH templates for common providers
+DOH_TEMPLATES = {
+    'google': 'https://dns.google/dns-query',
+    'cloudflare': 'https://cloudflare-dns.com/dns-query',
+    'quad9': 'https://dns.quad9.net/dns-query',
+    'opendns': 'https://doh.opendns.com/dns-query',
+    'adguard': 'https://dns.adguard-dns.com/dns-query',
+}
+
+# Known tags for common providers
+PROVIDER_TAGS = {
+    'google': ['public', 'fast', 'no-filter'],
+    'cloudflare': ['public', 'privacy', 'fast', 'no-filter'],
+    'quad9': ['public', 'security', 'malware-blocking', 'dnssec'],
+    'opendns': ['public', 'security', 'no-filter'],
+    'adguard': ['ad-block', 'tracker-block', 'phishing-block'],
+}
+
+# Public resolver addresses of the known providers; Windows binds a DoH template
+# to the server address, so the primary IP is the most reliable key
+_PROVIDER_BY_IP = {
+    '8.8.8.8': 'google', '8.8.4.4': 'google',
+    '1.1.1.1': 'cloudflare', '1.0.0.1': 'cloudflare',
+    '9.9.9.9': 'quad9', '149.112.112.112': 'quad9',
+    '208.67.222.222': 'opendns', '208.67.220.220': 'opendns',
+    '94.140.14.14': 'adguard', '94.140.15.15': 'adguard',
+}
+
+# Single alternation over all known provider keys, searched once per name
+_KNOWN_PROVIDER_RE = re.compile("|".join(re.escape(key) for key in DOH_TEMPLATES))
+
+# Dotted-quad IPv4 without leading zeros, matching ipaddress.ip_address
+_OCTET = r"(?:25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])"
+_IPV4_RE = re.compile(rf"{_OCTET}(?:\.{_OCTET}){{3}}")
+
+# Mirrors DNSProvider.name max_length
+_MAX_NAME_LENGTH = 100
+
+# can_migrate results; only the file name varies
+_MSG_NO_TXT = "No legacy dns_list.txt found"
+_MSG_YAML_EXISTS = "{} already exists. Delete it first if you want to re-migrate."
+_MSG_NO_ENTRIES = "No valid entries found in dns_list.txt"
+
 
 def parse_legacy_dns_file(file_path: Path) -> List[Tuple[str, List[str]]]:
     """
@@ -22,31 +68,33 @@ def parse_legacy_dns_file(file_path: Path) -> List[Tuple[str, List[str]]]:
     entries = []
     
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                
-                # Skip empty lines and comments
-                if not line or line.startswith('#'):
-                    continue
-                
-                parts = [p.strip() for p in line.split(',')]
-                if len(parts) < 2:
-                    logger.warning(f"Skipping invalid line {line_num}: {line}")
-                    continue
-                
-                name = parts[0]
-                dns_servers = parts[1:]
-                
-                # Filter out empty DNS entries
-                dns_servers = [dns for dns in dns_servers if dns]
-                
-                if not dns_servers:
-                    logger.warning(f"Skipping entry '{name}' with no DNS servers")
-                    continue
-                
-                entries.append((name, dns_servers))
-                
+        with open(file_path, 'rb') as f:
+            raw_lines = f.read().splitlines()
+        
+        # Skip empty lines and comments on the raw bytes, decoding only the entries
+        kept = [
+            (line_num, raw) for line_num, raw in enumerate(raw_lines, 1)
+            if (stripped := raw.strip()) and not stripped.startswith(b'#')
+        ]
+        
+        for line_num, raw in kept:
+            # Tokenize each line on its own so an unbalanced quote cannot swallow the lines after it
+            row = next(csv.reader([raw.decode('utf-8')], skipinitialspace=True), [])
+            name = row[0].strip() if row else ''
+            
+            if len(row) < 2:
+                logger.warning(f"Skipping invalid line {line_num}: {name}")
+                continue
+            
+            # Strip and filter out empty DNS entries in one pass
+            dns_servers = [dns for dns in map(str.strip, row[1:]) if dns]
+            
+            if not dns_servers:
+                logger.warning(f"Skipping entry '{name}' with no DNS servers")
+                continue
+            
+            entries.append((name, dns_servers))
+            
     except FileNotFoundError:
         logger.error(f"File not found: {file_path}")
         return []
@@ -68,59 +116,48 @@ def convert_legacy_to_providers(entries: List[Tuple[str, List[str]]]) -> List[DN
         List of DNSProvider objects
     """
     providers = []
-    
-    # Known DoH templates for common providers
-    doh_templates = {
-        'google': 'https://dns.google/dns-query',
-        'cloudflare': 'https://cloudflare-dns.com/dns-query',
-        'quad9': 'https://dns.quad9.net/dns-query',
-        'opendns': 'https://doh.opendns.com/dns-query',
-        'adguard': 'https://dns.adguard-dns.com/dns-query',
-    }
-    
-    # Known tags for common providers
-    provider_tags = {
-        'google': ['public', 'fast', 'no-filter'],
-        'cloudflare': ['public', 'privacy', 'fast', 'no-filter'],
-        'quad9': ['public', 'security', 'malware-blocking', 'dnssec'],
-        'opendns': ['public', 'security', 'no-filter'],
-        'adguard': ['ad-block', 'tracker-block', 'phishing-block'],
-    }
+    # Bound once for the per-address check below; large imports run it thousands of times
+    is_ipv4 = _IPV4_RE.fullmatch
     
     for name, dns_servers in entries:
         # Try to detect provider type for DoH and tags
-        name_lower = name.lower()
         doh_template = None
         tags = ['migrated']  # Default tag for migrated entries
         
-        # Check for known providers
-        for key, template in doh_templates.items():
-            if key in name_lower:
-                doh_template = template
-                tags = provider_tags.get(key, ['public'])
-                break
+        # Check for known providers, by primary address first and then by name
+        key = _PROVIDER_BY_IP.get(dns_servers[0]) if dns_servers else None
+        if key is None:
+            match = _KNOWN_PROVIDER_RE.search(name.lower())
+            key = match.group(0) if match else None
+        if key:
+            doh_template = DOH_TEMPLATES[key]
+            tags = list(PROVIDER_TAGS.get(key, ['public']))
         
-        # Create policy with DoH if template is available
-        policy = DNSPolicy(
+        # Migrated entries skip Pydantic validation, so reject bad input up front
+        if not name or len(name) > _MAX_NAME_LENGTH:
+            logger.error(f"Failed to convert provider '{name}': invalid name")
+            continue
+        
+        invalid = [ip for ip in dns_servers if not is_ipv4(ip)]
+        if invalid:
+            logger.error(f"Failed to convert provider '{name}': invalid IPv4 address {', '.join(invalid)}")
+            continue
+        
+        # Create policy with DoH if template is available (plain bools, trusted like the provider)
+        policy = DNSPolicy.model_construct(
             encrypted_only=doh_template is not None,
             autoupgrade=True,
-            allow_udp_fallback=False if doh_template else True
+            allow_udp_fallback=doh_template is None
         )
         
-        try:
-            provider = DNSProvider(
-                name=name,
-                ipv4=dns_servers,
-                doh_template=doh_template,
-                tags=tags,
-                policy=policy
-            )
-            providers.append(provider)
-            logger.info(f"Converted provider: {name}")
-            
-        except Exception as e:
-            logger.error(f"Failed to convert provider '{name}': {e}")
-            continue
+        providers.append(DNSProvider.model_construct(
+            name=name,
+            ipv4=dns_servers,
+            doh_template=doh_template,
+            tags=tags,
+            policy=policy
+        ))
+        logger.info(f"Converted provider: {name}")
     
     return providers
 
@@ -150,7 +187,13 @@ def migrate_txt_to_yaml(
         backup_path = yaml_path.with_suffix('.yaml.bak')
         try:
             import shutil
-            shutil.copy2(yaml_path, backup_path)
+            backup_path.unlink(missing_ok=True)
+            try:
+                # export_to_yaml replaces the file rather than rewriting it, so a hard link
+                # keeps the old content without copying it
+                os.link(yaml_path, backup_path)
+            except OSError:
+                shutil.copy2(yaml_path, backup_path)
             logger.info(f"Created backup: {backup_path}")
         except Exception as e:
             logger.warning(f"Could not create backup: {e}")
@@ -187,14 +230,14 @@ def can_migrate(txt_path: Path, yaml_path: Path) -> Tuple[bool, str]:
     yaml_exists = yaml_path.exists()
     
     if not txt_exists:
-        return False, "No legacy dns_list.txt found"
+        return False, _MSG_NO_TXT
     
     if yaml_exists:
-        return False, f"{yaml_path.name} already exists. Delete it first if you want to re-migrate."
+        return False, _MSG_YAML_EXISTS.format(yaml_path.name)
     
     # Parse to check if there are valid entries
     entries = parse_legacy_dns_file(txt_path)
     if not entries:
-        return False, "No valid entries found in dns_list.txt"
+        return False, _MSG_NO_ENTRIES
     
     return True, f"Found {len(entries)} entries ready for migration"
@@ -11,40 +11,69 @@ Features:
 
 import sys
 import os
+import atexit
 import logging
-from pathlib import Path
-
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('dnschanger.log', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+# Setup logging: callers (including the Tk thread) only enqueue records, a
+# background listener thread does the formatting and the file/console writes
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_log_handlers = [
+    logging.FileHandler('dnschanger.log', encoding='utf-8'),
+    logging.StreamHandler()
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, *_log_handlers)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+logging.getLogger().setLevel(logging.INFO)
+logging.getLogger().addHandler(QueueHandler(_log_queue))
 
 logger = logging.getLogger(__name__)
 
-# Add project root to path
-PROJECT_ROOT = Path(__file__).parent
-sys.path.insert(0, str(PROJECT_ROOT))
+# Add project root to path (already sys.path[0] when run as a script)
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+
+# shell32 is resolved once; None when not on Windows
+try:
+    import ctypes
+    _SHELL32 = ctypes.windll.shell32  # type: ignore
+    # HINSTANCE is pointer-sized; the default c_int restype truncates it on 64-bit
+    _SHELL32.ShellExecuteW.restype = ctypes.c_void_p
+except (ImportError, AttributeError, OSError):
+    _SHELL32 = None
 
 
 def check_admin_privileges() -> bool:
     """Check if running with administrator privileges."""
+    if _SHELL32 is None:
+        return False
     try:
-        import ctypes
-        return ctypes.windll.shell32.IsUserAnAdmin()  # type: ignore
-    except:
+        return bool(_SHELL32.IsUserAnAdmin())
+    except (OSError, AttributeError):
         return False
 
 
-def request_admin_elevation():
-    """Request administrator elevation."""
+def request_admin_elevation() -> bool:
+    """
+    Request administrator elevation.
+    
+    Returns:
+        True if the elevated instance was launched
+    """
+    if _SHELL32 is None:
+        logger.error("Admin elevation is only available on Windows")
+        return False
     try:
-        import ctypes
-        ctypes.windll.shell32.ShellExecuteW(  # type: ignore
+        ret = _SHELL32.ShellExecuteW(
             None,
             "runas",
             sys.executable,
@@ -54,6 +83,13 @@ def request_admin_elevation():
         )
     except Exception as e:
         logger.error(f"Failed to request admin elevation: {e}")
+        return False
+    
+    # ShellExecuteW returns a value greater than 32 on success (e.g. 5 when UAC is declined)
+    if (ret or 0) <= 32:
+        logger.error(f"ShellExecuteW failed: {ret or 0}")
+        return False
+    return True
 
 
 def main():
@@ -67,8 +103,16 @@ def main():
     # Check for admin privileges
     if not check_admin_privileges():
         logger.warning("Not running as administrator. Requesting elevation...")
-        request_admin_elevation()
-        sys.exit(0)
+        if request_admin_elevation():
+            sys.exit(0)
+        
+        # Elevation declined or failed: tell the user instead of exiting silently
+        try:
+            import tkinter.messagebox as _mb
+            _mb.showerror("DNSChanger", "DNSChanger requires administrator privileges to change DNS settings.")
+        except Exception:
+            pass
+        sys.exit(1)
     
     logger.info("Running with administrator privileges ✓")
     
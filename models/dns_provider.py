@@ -1,8 +1,19 @@
 """DNS Provider data models with Pydantic validation."""
 
+from collections import Counter
 from typing import List, Optional
-from pydantic import BaseModel, Field, field_validator, model_validator
-import ipaddress
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+import socket
+
+
+def _check_addresses(addresses: List[str], family: int, label: str) -> None:
+    """Raise ValueError for the first address that is not valid for the family."""
+    # inet_pton is a single C call, much cheaper than building ipaddress objects
+    for ip in addresses:
+        try:
+            socket.inet_pton(family, ip)
+        except (OSError, ValueError):
+            raise ValueError(f"Invalid {label} address '{ip}'")
 
 
 class DNSPolicy(BaseModel):
@@ -25,10 +36,19 @@ class DNSPolicy(BaseModel):
 class DNSProvider(BaseModel):
     """DNS provider configuration model."""
     
+    # Providers handed to DNSProviderList (export, migration) are reused as-is, not validated again
+    model_config = ConfigDict(revalidate_instances='never')
+    
+    # Changing the fields of DNSProvider or DNSPolicy requires bumping core.dns_loader._CACHE_SCHEMA_VERSION
     name: str = Field(..., min_length=1, max_length=100, description="Provider name")
     ipv4: List[str] = Field(..., min_length=1, description="List of IPv4 DNS addresses")
     ipv6: Optional[List[str]] = Field(default=None, description="List of IPv6 DNS addresses")
-    doh_template: Optional[str] = Field(default=None, description="DoH template URL")
+    # Checked by pydantic-core's pattern matcher, no Python validator callback
+    doh_template: Optional[str] = Field(
+        default=None,
+        pattern=r'^https?://',
+        description="DoH template URL (must start with https:// or http://)"
+    )
     tags: List[str] = Field(default_factory=list, description="Provider tags")
     policy: DNSPolicy = Field(default_factory=DNSPolicy, description="DNS policy settings")
     
@@ -36,13 +56,7 @@ class DNSProvider(BaseModel):
     @classmethod
     def validate_ipv4(cls, v: List[str]) -> List[str]:
         """Validate IPv4 addresses."""
-        for ip in v:
-            try:
-                addr = ipaddress.ip_address(ip)
-                if addr.version != 4:
-                    raise ValueError(f"'{ip}' is not a valid IPv4 address")
-            except ValueError as e:
-                raise ValueError(f"Invalid IPv4 address '{ip}': {e}")
+        _check_addresses(v, socket.AF_INET, "IPv4")
         return v
     
     @field_validator('ipv6')
@@ -51,21 +65,7 @@ class DNSProvider(BaseModel):
         """Validate IPv6 addresses."""
         if v is None:
             return None
-        for ip in v:
-            try:
-                addr = ipaddress.ip_address(ip)
-                if addr.version != 6:
-                    raise ValueError(f"'{ip}' is not a valid IPv6 address")
-            except ValueError as e:
-                raise ValueError(f"Invalid IPv6 address '{ip}': {e}")
-        return v
-    
-    @field_validator('doh_template')
-    @classmethod
-    def validate_doh_template(cls, v: Optional[str]) -> Optional[str]:
-        """Validate DoH template URL."""
-        if v is not None and not v.startswith(('https://', 'http://')):
-            raise ValueError(f"DoH template must start with https:// or http://")
+        _check_addresses(v, socket.AF_INET6, "IPv6")
         return v
     
     @model_validator(mode='after')
@@ -88,8 +88,7 @@ class DNSProviderList(BaseModel):
     @classmethod
     def validate_unique_names(cls, v: List[DNSProvider]) -> List[DNSProvider]:
         """Ensure provider names are unique."""
-        names = [p.name for p in v]
-        if len(names) != len(set(names)):
-            duplicates = [name for name in names if names.count(name) > 1]
-            raise ValueError(f"Duplicate provider names found: {', '.join(set(duplicates))}")
+        duplicates = [name for name, count in Counter(p.name for p in v).items() if count > 1]
+        if duplicates:
+            raise ValueError(f"Duplicate provider names found: {', '.join(duplicates)}")
         return v
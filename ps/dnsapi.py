@@ -0,0 +1,47 @@
+"""Native DNS client calls through the Windows DNS API (dnsapi.dll)."""
+
+import ctypes
+import logging
+import sys
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _load_dnsapi():
+    """Load dnsapi.dll, or None when not on Windows."""
+    if sys.platform != "win32":
+        return None
+    
+    try:
+        dll = ctypes.WinDLL("dnsapi.dll", use_last_error=True)
+        # Exported by dnsapi.dll but not declared in the SDK headers
+        dll.DnsFlushResolverCache.argtypes = []
+        dll.DnsFlushResolverCache.restype = ctypes.c_int
+    except (OSError, AttributeError) as e:
+        logger.warning(f"DNS API unavailable: {e}")
+        return None
+    return dll
+
+
+_DNSAPI = _load_dnsapi()
+
+
+def is_available() -> bool:
+    """Check if the native DNS API can be used."""
+    return _DNSAPI is not None
+
+
+def flush_resolver_cache() -> Optional[Tuple[bool, str]]:
+    """
+    Flush the DNS client resolver cache in-process, like ipconfig /flushdns.
+    
+    Returns:
+        Tuple of (success, message), or None if the native API is unavailable
+    """
+    if _DNSAPI is None:
+        return None
+    
+    if _DNSAPI.DnsFlushResolverCache():
+        return True, "DNS cache flushed successfully"
+    return False, ctypes.FormatError(ctypes.get_last_error()).strip()
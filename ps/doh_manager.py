@@ -1,14 +1,32 @@
 """DNS over HTTPS (DoH) manager for Windows 11/Server 2022."""
 
+import json
 import logging
 import platform
-from typing import List, Optional, Tuple, Dict
+import time
+from typing import Any, List, Optional, Tuple, Dict
 from dataclasses import dataclass
 from enum import Enum
 
+from ps.ps_adapter import json_loads
+
 logger = logging.getLogger(__name__)
 
 
+def _parse_windows_version(version: str) -> Tuple[int, int, int]:
+    """Parse a Windows (major, minor, build) version string, or (0, 0, 0) if unknown."""
+    parts = version.split('.')
+    try:
+        return int(parts[0]), int(parts[1]), int(parts[2])
+    except (IndexError, ValueError):
+        # If we can't determine version, assume nothing is supported
+        return (0, 0, 0)
+
+
+# The OS version cannot change while we run, so it is read once per process
+_WIN_VERSION = _parse_windows_version(platform.version())
+
+
 class DoHStatus(Enum):
     """DoH support status."""
     SUPPORTED = "supported"
@@ -17,7 +35,7 @@ class DoHStatus(Enum):
     UNKNOWN = "unknown"
 
 
-@dataclass
+@dataclass(slots=True)
 class DoHServer:
     """DoH server configuration."""
     server_address: str
@@ -26,7 +44,7 @@ class DoHServer:
     allow_fallback: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class DoHState:
     """Current DoH state for an interface."""
     interface_index: str
@@ -43,6 +61,10 @@ class DoHManager:
     MIN_WIN_VERSION_DOH = (10, 0, 20348)  # Windows Server 2022 / Windows 11
     MIN_WIN_VERSION_ENCRYPTION = (10, 0, 22000)  # Windows 11
     
+    # Seconds the system DoH state, or a failed query for it, stays valid
+    CACHE_TTL = 5.0
+    NEGATIVE_CACHE_TTL = 1.0
+    
     def __init__(self, ps_adapter):
         """
         Initialize DoH manager.
@@ -51,6 +73,10 @@ class DoHManager:
             ps_adapter: PowerShell adapter for executing commands
         """
         self.ps_adapter = ps_adapter
+        self._win_version = _WIN_VERSION
+        # (timestamp, state) of the last successful query, and time of the last failed one
+        self._system_state_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        self._system_state_failed_at: Optional[float] = None
         self._check_support()
     
     def _check_support(self) -> None:
@@ -70,30 +96,11 @@ class DoHManager:
     
     def _is_doh_supported(self) -> bool:
         """Check if DoH is supported on current Windows version."""
-        try:
-            version = platform.version().split('.')
-            major = int(version[0])
-            minor = int(version[1])
-            build = int(version[2])
-            
-            win_version = (major, minor, build)
-            return win_version >= self.MIN_WIN_VERSION_DOH
-        except:
-            # If we can't determine version, assume not supported
-            return False
+        return self._win_version >= self.MIN_WIN_VERSION_DOH
     
     def _is_encryption_supported(self) -> bool:
         """Check if DNS encryption is supported."""
-        try:
-            version = platform.version().split('.')
-            major = int(version[0])
-            minor = int(version[1])
-            build = int(version[2])
-            
-            win_version = (major, minor, build)
-            return win_version >= self.MIN_WIN_VERSION_ENCRYPTION
-        except:
-            return False
+        return self._win_version >= self.MIN_WIN_VERSION_ENCRYPTION
     
     def is_supported(self) -> Tuple[bool, str]:
         """
@@ -117,22 +124,9 @@ class DoHManager:
     
     def _check_policy(self) -> Tuple[bool, str]:
         """Check if DoH is blocked by Group Policy."""
-        command = """
-        try {
-            $policy = Get-ItemProperty -Path 'HKLM:\\SOFTWARE\\Policies\\Microsoft\\Windows NT\\DNSClient' -Name EnableAutoDoh -ErrorAction SilentlyContinue
-            if ($policy -and $policy.EnableAutoDoh -eq 0) {
-                'BLOCKED'
-            } else {
-                'ALLOWED'
-            }
-        } catch {
-            'ALLOWED'
-        }
-        """
-        
-        success, output = self.ps_adapter.execute(command)
+        state = self.get_system_doh_state()
         
-        if success and output.strip() == 'BLOCKED':
+        if state and state.get('PolicyBlocked'):
             return True, (
                 "DoH is blocked by Group Policy. Contact your system administrator to enable DoH, "
                 "or modify the registry key: "
@@ -163,19 +157,19 @@ class DoHManager:
         if not self.doh_supported:
             return False, "DoH is not supported on this Windows version"
         
-        # Remove existing entry first
-        self.remove_doh_server(server_address)
-        
-        # Add new DoH server
-        command = f"""
-        Add-DnsClientDohServerAddress `
-            -ServerAddress '{server_address}' `
-            -DohTemplate '{doh_template}' `
-            -AutoUpgrade:${str(auto_upgrade)} `
-            -AllowFallbackToUdp:${str(allow_fallback)}
-        """
+        try:
+            address = self.ps_adapter.format_addresses([server_address])
+        except ValueError as e:
+            return False, str(e)
+        
+        # Set-DohServer (defined once per session) removes any existing entry and adds the new one
+        command = (
+            f"Set-DohServer -ServerAddress {address} -DohTemplate {self.ps_adapter.quote(doh_template)} "
+            f"-AutoUpgrade ${auto_upgrade} -AllowFallback ${allow_fallback}"
+        )
         
         success, output = self.ps_adapter.execute(command)
+        self.invalidate_cache()
         
         if success:
             logger.info(f"Added DoH server: {server_address} -> {doh_template}")
@@ -197,9 +191,15 @@ class DoHManager:
         if not self.doh_supported:
             return False, "DoH is not supported on this Windows version"
         
-        command = f"Remove-DnsClientDohServerAddress -ServerAddress '{server_address}' -ErrorAction SilentlyContinue"
+        try:
+            address = self.ps_adapter.format_addresses([server_address])
+        except ValueError as e:
+            return False, str(e)
+        
+        command = f"Remove-DnsClientDohServerAddress -ServerAddress {address} -ErrorAction SilentlyContinue"
         
         success, output = self.ps_adapter.execute(command)
+        self.invalidate_cache()
         
         if success:
             logger.info(f"Removed DoH server: {server_address}")
@@ -219,40 +219,78 @@ class DoHManager:
         if not self.doh_supported:
             return []
         
+        state = self.get_system_doh_state()
+        if not state:
+            return []
+        
+        # The query already emits DoHServer field names
+        return [DoHServer(**item) for item in state.get('DohServers') or []]
+    
+    def get_system_doh_state(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the policy, encryption and DoH server state with one PowerShell call.
+        
+        Returns:
+            Dict with 'PolicyBlocked' (bool), 'EnableDohEbpf' (int or None) and
+            'DohServers' (list of DoHServer field dicts), or None if the query failed
+        """
+        now = time.monotonic()
+        if self._system_state_cache and now - self._system_state_cache[0] < self.CACHE_TTL:
+            return self._system_state_cache[1]
+        if self._system_state_failed_at is not None and now - self._system_state_failed_at < self.NEGATIVE_CACHE_TTL:
+            return None
+        
+        state = self._query_system_doh_state()
+        if state is None:
+            self._system_state_failed_at = time.monotonic()
+            return None
+        
+        self._system_state_cache = (time.monotonic(), state)
+        self._system_state_failed_at = None
+        return state
+    
+    def _query_system_doh_state(self) -> Optional[Dict[str, Any]]:
+        """Run the combined state query, returning None if it fails."""
+        # Ogni campo ha il suo try: un valore mancante non invalida gli altri
         command = """
-        Get-DnsClientDohServerAddress | 
-        Select-Object ServerAddress, DohTemplate, AutoUpgrade, AllowFallbackToUdp | 
-        ConvertTo-Json
+        $state = [ordered]@{ PolicyBlocked = $false; EnableDohEbpf = $null; DohServers = @() }
+        try {
+            $policy = Get-ItemProperty -Path 'HKLM:\\SOFTWARE\\Policies\\Microsoft\\Windows NT\\DNSClient' -Name EnableAutoDoh -ErrorAction Stop
+            $state.PolicyBlocked = ($policy.EnableAutoDoh -eq 0)
+        } catch {}
+        try {
+            $state.EnableDohEbpf = [int](Get-ItemPropertyValue -Path 'HKLM:\\SYSTEM\\CurrentControlSet\\Services\\Dnscache\\Parameters' -Name EnableDohEbpf -ErrorAction Stop)
+        } catch {}
+        try {
+            $state.DohServers = @(Get-DnsClientDohServerAddress -ErrorAction Stop | Select-Object `
+                @{ n = 'server_address'; e = { [string]$_.ServerAddress } },
+                @{ n = 'doh_template'; e = { [string]$_.DohTemplate } },
+                @{ n = 'auto_upgrade'; e = { [bool]$_.AutoUpgrade } },
+                @{ n = 'allow_fallback'; e = { [bool]$_.AllowFallbackToUdp } })
+        } catch {}
+        ConvertTo-Json -InputObject $state -Depth 3 -Compress
         """
         
         success, output = self.ps_adapter.execute(command)
         
         if not success or not output:
-            return []
+            return None
         
         try:
-            import json
-            data = json.loads(output)
-            
-            # Handle single item vs array
-            if isinstance(data, dict):
-                data = [data]
-            
-            servers = []
-            for item in data:
-                server = DoHServer(
-                    server_address=item.get('ServerAddress', ''),
-                    doh_template=item.get('DohTemplate', ''),
-                    auto_upgrade=item.get('AutoUpgrade', True),
-                    allow_fallback=item.get('AllowFallbackToUdp', False)
-                )
-                servers.append(server)
-            
-            return servers
-            
-        except Exception as e:
-            logger.error(f"Failed to parse DoH servers: {e}")
-            return []
+            state = json_loads(output)
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse DoH state: {e}")
+            return None
+        
+        # Handle single item vs array
+        if isinstance(state.get('DohServers'), dict):
+            state['DohServers'] = [state['DohServers']]
+        return state
+    
+    def invalidate_cache(self) -> None:
+        """Forget the cached system DoH state."""
+        self._system_state_cache = None
+        self._system_state_failed_at = None
     
     def set_interface_encryption(
         self,
@@ -277,19 +315,12 @@ class DoHManager:
         if not self.encryption_supported:
             return False, "DNS encryption settings require Windows 11 or newer"
         
-        reg_path = r"HKLM:\SYSTEM\CurrentControlSet\Services\Dnscache\Parameters"
-        value_name = "EnableDohEbpf"
         value = 1 if encrypted_only else 0
         
+        # Set-DohEncryption (defined once per session) restarts Dnscache only when the value changes
         command = f"""
         try {{
-            $path = '{reg_path}'
-            if (-not (Test-Path $path)) {{
-                New-Item -Path $path -Force | Out-Null
-            }}
-            Set-ItemProperty -Path $path -Name '{value_name}' -Value {value} -Type DWord
-            # Riavvia il servizio Dnscache per applicare la modifica
-            Restart-Service -Name Dnscache -Force -ErrorAction SilentlyContinue
+            Set-DohEncryption -Value {value}
             'OK'
         }} catch {{
             $_.Exception.Message
@@ -297,6 +328,7 @@ class DoHManager:
         """
         
         success, output = self.ps_adapter.execute(command)
+        self.invalidate_cache()
         
         if success and output.strip() == 'OK':
             mode = "Encrypted only (DoH)" if encrypted_only else "Automatic"
@@ -307,27 +339,35 @@ class DoHManager:
             logger.error(f"Failed to set encryption mode: {error_msg}")
             return False, error_msg
     
-    def get_interface_doh_state(self, interface_index: str, interface_name: str) -> DoHState:
+    def get_interface_doh_state(
+        self,
+        interface_index: str,
+        interface_name: str,
+        dns_servers: Optional[List[str]] = None
+    ) -> DoHState:
         """
         Get DoH state for a network interface.
         
         Args:
             interface_index: Network interface index
             interface_name: Network interface name
+            dns_servers: Current DNS servers of the interface, if already known
             
         Returns:
             DoHState object
         """
         # Get DNS servers for interface
-        dns_servers = self.ps_adapter.get_dns_servers(interface_index)
+        if dns_servers is None:
+            dns_servers = self.ps_adapter.get_dns_servers(interface_index)
         
         # Get registered DoH servers
         all_doh_servers = self.get_doh_servers()
         
         # Find DoH servers that match interface DNS servers
+        dns_set = frozenset(dns_servers)
         interface_doh_servers = [
             doh for doh in all_doh_servers
-            if doh.server_address in dns_servers
+            if doh.server_address in dns_set
         ]
         
         state = DoHState(
@@ -344,29 +384,40 @@ class DoHManager:
         
         return state
     
-    def _get_encryption_info(self, interface_index: str) -> Tuple[bool, Optional[str]]:
-        """Get encryption information by reading the Dnscache registry key."""
-        reg_path = r"HKLM:\SYSTEM\CurrentControlSet\Services\Dnscache\Parameters"
-        value_name = "EnableDohEbpf"
-        
-        command = f"""
-        try {{
-            $val = Get-ItemPropertyValue -Path '{reg_path}' -Name '{value_name}' -ErrorAction Stop
-            $val.ToString()
-        }} catch {{
-            'NOT_SET'
-        }}
+    def get_all_interface_doh_states(
+        self,
+        interfaces: List[Tuple[str, str]]
+    ) -> List[DoHState]:
         """
+        Get DoH state for several network interfaces.
         
-        success, output = self.ps_adapter.execute(command)
+        The DNS servers of all interfaces come from one bulk query and the
+        registered DoH servers/encryption mode from one cached system query,
+        so the cost does not grow with the number of interfaces.
         
-        if not success:
+        Args:
+            interfaces: List of (interface_index, interface_name) pairs
+            
+        Returns:
+            List of DoHState objects, in the same order as interfaces
+        """
+        dns_by_index = self.ps_adapter.get_dns_servers_bulk([index for index, _ in interfaces])
+        return [
+            self.get_interface_doh_state(index, name, dns_by_index.get(str(index), []))
+            for index, name in interfaces
+        ]
+    
+    def _get_encryption_info(self, interface_index: str) -> Tuple[bool, Optional[str]]:
+        """Get encryption information from the Dnscache EnableDohEbpf registry value."""
+        state = self.get_system_doh_state()
+        
+        if not state:
             return False, None
         
-        raw = output.strip()
-        if raw == '1':
+        value = state.get('EnableDohEbpf')
+        if value == 1:
             return True, "Encrypted only (DoH)"
-        elif raw == '0':
+        elif value == 0:
             return False, "Automatic (encryption disabled)"
         else:
             # Chiave non presente = comportamento predefinito (automatic)
@@ -395,79 +446,167 @@ class DoHManager:
         Returns:
             Tuple of (success, message)
         """
-        messages = []
+        return self.configure_provider_doh_bulk(
+            [(interface_index, dns_servers)],
+            doh_template,
+            policy_encrypted_only,
+            policy_auto_upgrade,
+            policy_allow_fallback
+        )[0]
+    
+    def configure_provider_doh_bulk(
+        self,
+        items: List[Tuple[str, List[str]]],
+        doh_template: Optional[str],
+        policy_encrypted_only: bool = False,
+        policy_auto_upgrade: bool = True,
+        policy_allow_fallback: bool = False
+    ) -> List[Tuple[bool, str]]:
+        """
+        Configure DoH for a DNS provider on several interfaces with one PowerShell script.
         
-        # Combinare l'impostazione DNS e DoH in un singolo comando PowerShell
-        # per evitare l'overhead di avviare ripetutamente powershell.exe
-        formatted_dns = ",".join([f'"{dns.strip()}"' for dns in dns_servers])
+        Args:
+            items: List of (interface_index, dns_servers) pairs
+            doh_template: DoH template URL (None to skip DoH)
+            policy_encrypted_only: Require encrypted DNS only
+            policy_auto_upgrade: Auto-upgrade to DoH when possible
+            policy_allow_fallback: Allow fallback to unencrypted DNS
+            
+        Returns:
+            List of (success, message) tuples, in the same order as items
+        """
+        if not items:
+            return []
+        
+        needs_doh = bool(doh_template)
+        
+        # Un solo script per tutte le interfacce: il ciclo gira dentro PowerShell
+        entries = []
+        known: Dict[str, Tuple[bool, str]] = {}
+        for index, dns_servers in items:
+            try:
+                entries.append(f"@{{Idx={int(index)}; Dns=@({self.ps_adapter.format_addresses(dns_servers)})}}")
+            except ValueError as e:
+                known[str(index)] = (False, str(e))
+        
+        if not entries:
+            return [known[str(index)] for index, _ in items]
+        
+        configs = ",\n            ".join(entries)
+        template = self.ps_adapter.quote(doh_template or "")
+        
+        # The DNS servers are always set: the effective servers may be DHCP-assigned or
+        # stale, so only the DoH registrations that already match are skipped
+        registered = ""
+        if needs_doh and self.doh_supported:
+            registered = "; ".join(
+                f"{self.ps_adapter.quote(address)} = $true"
+                for address in self._matching_doh_servers(doh_template, policy_auto_upgrade, policy_allow_fallback)
+            )
         
         ps_script = f"""
         $ErrorActionPreference = 'Stop'
-        $msgs = @()
-        
-        try {{
-            # 1. Imposta i server DNS
-            Set-DnsClientServerAddress -InterfaceIndex {interface_index} -ServerAddresses ({formatted_dns}) -Validate
-            $msgs += "DNS servers applied successfully"
-            
-            # 2. Configura DoH se richiesto e supportato
-            $needs_doh = $false
-            if ('{doh_template}' -ne 'None' -and '{doh_template}' -ne '') {{
-                $needs_doh = $true
-            }}
+        $configs = @(
+            {configs}
+        )
+        $registered = @{{{registered}}}
+        $results = @()
+        
+        foreach ($c in $configs) {{
+            $msgs = @()
+            try {{
+                # 1. Imposta i server DNS
+                Set-DnsClientServerAddress -InterfaceIndex $c.Idx -ServerAddresses $c.Dns -Validate
+                $msgs += "DNS servers applied successfully"
         """
         
-        if self.doh_supported:
+        if needs_doh and self.doh_supported:
             ps_script += f"""
-            if ($needs_doh) {{
-                # Rimuovi eventuali DoH precedenti per i nuovi IP
-                foreach ($dns in ({formatted_dns})) {{
-                    Remove-DnsClientDohServerAddress -ServerAddress $dns -ErrorAction SilentlyContinue
-                    
-                    # Aggiungi il nuovo DoH
-                    Add-DnsClientDohServerAddress `
-                        -ServerAddress $dns `
-                        -DohTemplate '{doh_template}' `
-                        -AutoUpgrade:${str(policy_auto_upgrade)} `
-                        -AllowFallbackToUdp:${str(policy_allow_fallback)}
-                        
+                # 2. Registra il DoH una sola volta per ogni IP
+                foreach ($dns in $c.Dns) {{
+                    if (-not $registered.ContainsKey($dns)) {{
+                        Set-DohServer -ServerAddress $dns -DohTemplate {template} `
+                            -AutoUpgrade ${policy_auto_upgrade} -AllowFallback ${policy_allow_fallback}
+                        $registered[$dns] = $true
+                    }}
                     $msgs += "DoH configured for $dns"
                 }}
             """
-            if self.encryption_supported and policy_encrypted_only:
-                ps_script += f"""
-                # Imposta Encryption Only Mode (Windows 11+)
-                $reg_path = 'HKLM:\\SYSTEM\\CurrentControlSet\\Services\\Dnscache\\Parameters'
-                if (-not (Test-Path $reg_path)) {{
-                    New-Item -Path $reg_path -Force | Out-Null
-                }}
-                Set-ItemProperty -Path $reg_path -Name 'EnableDohEbpf' -Value 1 -Type DWord
-                Restart-Service -Name Dnscache -Force -ErrorAction SilentlyContinue
-                $msgs += "🔒 Encryption: Encrypted only"
-                """
+        elif needs_doh:
             ps_script += """
-            }
+                $msgs += "⚠️  DoH not supported on this Windows version"
             """
-        else:
+        
+        ps_script += """
+                $results += [pscustomobject]@{ Idx = "$($c.Idx)"; Ok = $true; Msg = ($msgs -join "`n") }
+            } catch {
+                $results += [pscustomobject]@{ Idx = "$($c.Idx)"; Ok = $false; Msg = $_.Exception.Message }
+            }
+        }
+        """
+        
+        if needs_doh and self.doh_supported and self.encryption_supported and policy_encrypted_only:
             ps_script += """
-            if ($needs_doh) {
-                $msgs += "⚠️  DoH not supported on this Windows version"
+        # 3. Imposta Encryption Only Mode una volta sola (Windows 11+)
+        if ($results | Where-Object { $_.Ok }) {
+            try {
+                Set-DohEncryption -Value 1
+                foreach ($r in $results) { if ($r.Ok) { $r.Msg += "`n🔒 Encryption: Encrypted only" } }
+            } catch {
+                $err = $_.Exception.Message
+                foreach ($r in $results) { if ($r.Ok) { $r.Ok = $false; $r.Msg = $err } }
             }
+        }
             """
-            
+        
         ps_script += """
-            $msgs -join "`n"
-        } catch {
-            Write-Error $_.Exception.Message
-            exit 1
-        }
+        ConvertTo-Json -InputObject @($results) -Compress
         """
         
         success, output = self.ps_adapter.execute(ps_script)
+        self.invalidate_cache()
+        for index, _ in items:
+            self.ps_adapter.invalidate_cache(index)
         
-        if success:
-            logger.info(f"Applied DNS and DoH configuration for interface {interface_index}")
-            return True, output.strip()
-        else:
+        if not success:
             logger.error(f"Failed to apply DNS/DoH configuration: {output}")
-            return False, output
+            return [known.get(str(index), (False, output)) for index, _ in items]
+        
+        try:
+            data = json_loads(output)
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse DNS/DoH configuration results: {e}")
+            return [known.get(str(index), (False, output)) for index, _ in items]
+        
+        if isinstance(data, dict):
+            data = [data]
+        by_index = {str(item.get('Idx')): item for item in data}
+        
+        results = []
+        for index, _ in items:
+            item = by_index.get(str(index))
+            if str(index) in known:
+                results.append(known[str(index)])
+            elif item is None:
+                results.append((False, "No result reported for this interface"))
+            elif item.get('Ok'):
+                logger.info(f"Applied DNS and DoH configuration for interface {index}")
+                results.append((True, (item.get('Msg') or '').strip()))
+            else:
+                logger.error(f"Failed to apply DNS/DoH configuration for interface {index}: {item.get('Msg')}")
+                results.append((False, item.get('Msg') or ''))
+        return results
+    
+    def _matching_doh_servers(
+        self,
+        doh_template: str,
+        policy_auto_upgrade: bool,
+        policy_allow_fallback: bool
+    ) -> List[str]:
+        """Addresses already registered with this DoH template and policy (read fresh, not cached)."""
+        self.invalidate_cache()
+        target = (doh_template, policy_auto_upgrade, policy_allow_fallback)
+        return [
+            doh.server_address for doh in self.get_doh_servers()
+            if (doh.doh_template, doh.auto_upgrade, doh.allow_fallback) == target
+        ]
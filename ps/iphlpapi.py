@@ -0,0 +1,201 @@
+"""Native adapter and DNS queries through the Windows IP Helper API (iphlpapi.dll)."""
+
+import ctypes
+import logging
+import socket
+import sys
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+AF_UNSPEC = 0
+AF_INET = 2
+
+GAA_FLAG_SKIP_UNICAST = 0x0001
+GAA_FLAG_SKIP_ANYCAST = 0x0002
+GAA_FLAG_SKIP_MULTICAST = 0x0004
+
+ERROR_SUCCESS = 0
+ERROR_BUFFER_OVERFLOW = 111
+ERROR_NO_DATA = 232
+
+# IANA ifType values used by the adapter filter
+IF_TYPE_SOFTWARE_LOOPBACK = 24
+IF_TYPE_TUNNEL = 131
+
+# IF_OPER_STATUS -> Get-NetAdapter Status text
+OPER_STATUS = {
+    1: "Up",
+    2: "Disconnected",
+    3: "Testing",
+    4: "Unknown",
+    5: "Dormant",
+    6: "Not Present",
+    7: "LowerLayerDown",
+}
+
+# TransmitLinkSpeed reported when the speed is unknown
+UNKNOWN_LINK_SPEED = 0xFFFFFFFFFFFFFFFF
+
+
+class SOCKADDR(ctypes.Structure):
+    _fields_ = [
+        ("sa_family", ctypes.c_ushort),
+        ("sa_data", ctypes.c_ubyte * 14),
+    ]
+
+
+class SOCKET_ADDRESS(ctypes.Structure):
+    _fields_ = [
+        ("lpSockaddr", ctypes.POINTER(SOCKADDR)),
+        ("iSockaddrLength", ctypes.c_int),
+    ]
+
+
+class IP_ADAPTER_DNS_SERVER_ADDRESS(ctypes.Structure):
+    pass
+
+
+IP_ADAPTER_DNS_SERVER_ADDRESS._fields_ = [
+    ("Alignment", ctypes.c_ulonglong),
+    ("Next", ctypes.POINTER(IP_ADAPTER_DNS_SERVER_ADDRESS)),
+    ("Address", SOCKET_ADDRESS),
+]
+
+
+class IP_ADAPTER_ADDRESSES(ctypes.Structure):
+    """Leading fields of IP_ADAPTER_ADDRESSES_LH, up to the link speeds."""
+    pass
+
+
+IP_ADAPTER_ADDRESSES._fields_ = [
+    ("Length", ctypes.c_ulong),
+    ("IfIndex", ctypes.c_ulong),
+    ("Next", ctypes.POINTER(IP_ADAPTER_ADDRESSES)),
+    ("AdapterName", ctypes.c_char_p),
+    ("FirstUnicastAddress", ctypes.c_void_p),
+    ("FirstAnycastAddress", ctypes.c_void_p),
+    ("FirstMulticastAddress", ctypes.c_void_p),
+    ("FirstDnsServerAddress", ctypes.POINTER(IP_ADAPTER_DNS_SERVER_ADDRESS)),
+    ("DnsSuffix", ctypes.c_wchar_p),
+    ("Description", ctypes.c_wchar_p),
+    ("FriendlyName", ctypes.c_wchar_p),
+    ("PhysicalAddress", ctypes.c_ubyte * 8),
+    ("PhysicalAddressLength", ctypes.c_ulong),
+    ("Flags", ctypes.c_ulong),
+    ("Mtu", ctypes.c_ulong),
+    ("IfType", ctypes.c_ulong),
+    ("OperStatus", ctypes.c_int),
+    ("Ipv6IfIndex", ctypes.c_ulong),
+    ("ZoneIndices", ctypes.c_ulong * 16),
+    ("FirstPrefix", ctypes.c_void_p),
+    ("TransmitLinkSpeed", ctypes.c_ulonglong),
+    ("ReceiveLinkSpeed", ctypes.c_ulonglong),
+]
+
+
+def _load_iphlpapi():
+    """Load iphlpapi.dll, or None when not on Windows."""
+    if sys.platform != "win32":
+        return None
+    
+    try:
+        dll = ctypes.WinDLL("iphlpapi.dll")
+    except OSError as e:
+        logger.warning(f"IP Helper API unavailable: {e}")
+        return None
+    
+    dll.GetAdaptersAddresses.argtypes = [
+        ctypes.c_ulong, ctypes.c_ulong, ctypes.c_void_p,
+        ctypes.c_void_p, ctypes.POINTER(ctypes.c_ulong)
+    ]
+    dll.GetAdaptersAddresses.restype = ctypes.c_ulong
+    return dll
+
+
+_IPHLPAPI = _load_iphlpapi()
+
+
+def is_available() -> bool:
+    """Check if the native IP Helper API can be used."""
+    return _IPHLPAPI is not None
+
+
+def _format_link_speed(bits_per_second: int) -> Optional[str]:
+    """Format a link speed like Get-NetAdapter's LinkSpeed (e.g. '1 Gbps')."""
+    if bits_per_second in (0, UNKNOWN_LINK_SPEED):
+        return None
+    for unit, scale in (("Gbps", 10**9), ("Mbps", 10**6), ("Kbps", 10**3)):
+        if bits_per_second >= scale:
+            return f"{round(bits_per_second / scale, 1):g} {unit}"
+    return f"{bits_per_second} bps"
+
+
+def _ipv4_dns_servers(adapter: IP_ADAPTER_ADDRESSES) -> List[str]:
+    """Collect the IPv4 DNS server addresses of an adapter."""
+    servers = []
+    node = adapter.FirstDnsServerAddress
+    while node:
+        sockaddr = node.contents.Address.lpSockaddr
+        if sockaddr and sockaddr.contents.sa_family == AF_INET:
+            # sockaddr_in: sin_port (2 bytes) then sin_addr (4 bytes); c_ubyte keeps
+            # the zero port bytes that a c_char array would cut off at the first NUL
+            servers.append(socket.inet_ntoa(bytes(sockaddr.contents.sa_data)[2:6]))
+        node = node.contents.Next
+    return servers
+
+
+def get_adapters() -> Optional[List[Dict[str, Any]]]:
+    """
+    Enumerate network adapters with a single GetAdaptersAddresses call.
+    
+    Returns:
+        List of dicts shaped like Get-NetAdapter JSON (plus 'DnsServers'),
+        or None if the native API is unavailable or fails
+    """
+    if _IPHLPAPI is None:
+        return None
+    
+    # Only adapter fields and DNS servers are read; skipping the address lists keeps the buffer small
+    flags = GAA_FLAG_SKIP_UNICAST | GAA_FLAG_SKIP_ANYCAST | GAA_FLAG_SKIP_MULTICAST
+    size = ctypes.c_ulong(16 * 1024)
+    
+    # The required size can grow between calls when adapters appear
+    for _ in range(3):
+        buffer = ctypes.create_string_buffer(size.value)
+        ret = _IPHLPAPI.GetAdaptersAddresses(AF_UNSPEC, flags, None, buffer, ctypes.byref(size))
+        if ret != ERROR_BUFFER_OVERFLOW:
+            break
+    
+    if ret == ERROR_NO_DATA:
+        return []
+    if ret != ERROR_SUCCESS:
+        logger.warning(f"GetAdaptersAddresses failed with error {ret}")
+        return None
+    
+    try:
+        return _decode_adapters(ctypes.cast(buffer, ctypes.POINTER(IP_ADAPTER_ADDRESSES)))
+    except (OSError, ValueError) as e:
+        logger.warning(f"Failed to decode GetAdaptersAddresses result: {e}")
+        return None
+
+
+def _decode_adapters(node) -> List[Dict[str, Any]]:
+    """Convert an IP_ADAPTER_ADDRESSES chain into Get-NetAdapter shaped dicts."""
+    adapters = []
+    while node:
+        adapter = node.contents
+        mac = bytes(adapter.PhysicalAddress[:adapter.PhysicalAddressLength])
+        adapters.append({
+            'Name': adapter.FriendlyName or '',
+            'InterfaceIndex': adapter.IfIndex,
+            'InterfaceDescription': adapter.Description or '',
+            'Status': OPER_STATUS.get(adapter.OperStatus, 'Unknown'),
+            'LinkSpeed': _format_link_speed(adapter.TransmitLinkSpeed),
+            'InterfaceType': adapter.IfType,
+            'MacAddress': "-".join(f"{b:02X}" for b in mac) or None,
+            'DnsServers': _ipv4_dns_servers(adapter),
+        })
+        node = adapter.Next
+    
+    return adapters
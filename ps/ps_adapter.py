@@ -1,14 +1,32 @@
 """PowerShell adapter for Windows DNS management."""
 
 import subprocess
+import csv
+import io
+import ipaddress
 import json
 import logging
+import operator
+import re
+import shutil
+import time
 from typing import List, Optional, Tuple, Dict, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
+from functools import lru_cache
+
+from ps import dnsapi, iphlpapi
+from ps.ps_session import POWERSHELL_FLAGS, PowerShellSessionPool
 
 logger = logging.getLogger(__name__)
 
+# orjson (optional) parses PowerShell's ConvertTo-Json output several times faster;
+# its JSONDecodeError subclasses json.JSONDecodeError, so callers catch either
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
 
 class InterfaceType(Enum):
     """Network interface type."""
@@ -20,7 +38,7 @@ class InterfaceType(Enum):
     UNKNOWN = "unknown"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class NetworkAdapter:
     """Network adapter information."""
     name: str
@@ -31,12 +49,17 @@ class NetworkAdapter:
     interface_type: InterfaceType = InterfaceType.UNKNOWN
     is_physical: bool = False
     mac_address: Optional[str] = None
+    _display_name: str = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self) -> None:
+        # Frozen, so the name can be formatted once instead of on every repaint
+        speed = f" [{self.link_speed}]" if self.link_speed else ""
+        object.__setattr__(self, '_display_name', f"{self.name}{speed}")
     
     @property
     def display_name(self) -> str:
         """Get formatted display name."""
-        speed = f" [{self.link_speed}]" if self.link_speed else ""
-        return f"{self.name}{speed}"
+        return self._display_name
 
 
 class PowerShellAdapter:
@@ -48,18 +71,131 @@ class PowerShellAdapter:
         'TAP', 'VPN', 'Wi-Fi Direct', 'Bluetooth', 'vEthernet'
     ]
     
+    # Case-insensitive matchers used to classify adapters, one regex scan each
+    _LOOPBACK_RE = re.compile(r"loopback", re.IGNORECASE)
+    _VPN_RE = re.compile(r"vpn|ras|pptp|l2tp", re.IGNORECASE)
+    _TAP_RE = re.compile(r"tap|tun", re.IGNORECASE)
+    _VIRTUAL_RE = re.compile("|".join(map(re.escape, VIRTUAL_PATTERNS)), re.IGNORECASE)
+    
+    # Every adapter source (native, CSV, JSON) emits all of these keys
+    _ADAPTER_FIELDS = operator.itemgetter(
+        'Name', 'InterfaceIndex', 'InterfaceDescription', 'Status', 'LinkSpeed', 'InterfaceType', 'MacAddress'
+    )
+    
+    # Known PowerShell error fragments and the message shown for each, checked in priority order
+    _ERROR_MESSAGES = (
+        ("access is denied", "Access denied. Administrator privileges required."),
+        ("does not exist", "Network adapter not found or unavailable."),
+        ("parameter is incorrect", "Invalid DNS server address or configuration."),
+        ("not supported", "Operation not supported on this Windows version."),
+    )
+    
+    # Addresses come pre-quoted from format_addresses, the index is always an int
+    _SET_DNS_TEMPLATE = "Set-DnsClientServerAddress -InterfaceIndex {index} -ServerAddresses @({addresses}){validate}"
+    
     # Default timeout for PowerShell commands (seconds)
     DEFAULT_TIMEOUT = 30
     
-    def __init__(self, timeout: int = DEFAULT_TIMEOUT):
+    # Maximum number of PowerShell hosts running commands concurrently
+    DEFAULT_MAX_SESSIONS = 4
+    
+    # Seconds adapter lists and DNS server reads are reused before querying again
+    CACHE_TTL = 5.0
+    
+    # PowerShell 7 (.NET Core) starts and parses noticeably faster than Windows PowerShell 5.1
+    PREFERRED_EXECUTABLES = ("pwsh", "powershell")
+    
+    def __init__(
+        self,
+        timeout: int = DEFAULT_TIMEOUT,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        executable: Optional[str] = None
+    ):
         """
         Initialize PowerShell adapter.
         
         Args:
             timeout: Default timeout for PowerShell commands in seconds
+            max_sessions: Maximum number of commands executed in parallel
+            executable: PowerShell executable. Defaults to pwsh if installed, else powershell.
         """
         self.timeout = timeout
+        self.max_sessions = max_sessions
+        self.executable = executable or self._find_executable()
         self.last_error: Optional[str] = None
+        # Built once: sent to every new session and prepended to one-shot fallback commands
+        self._functions_script = self._session_functions()
+        self._pool = PowerShellSessionPool(max_sessions, self.executable, self._functions_script)
+        logger.info(f"Using PowerShell executable: {self.executable}")
+        
+        # (timestamp, value) entries, see CACHE_TTL
+        self._adapter_cache: Dict[Tuple[bool, bool], Tuple[float, List[NetworkAdapter]]] = {}
+        self._dns_cache: Dict[str, Tuple[float, List[str]]] = {}
+    
+    @classmethod
+    def _session_functions(cls) -> str:
+        """
+        PowerShell functions defined once per session, so recurring queries are short calls
+        instead of pipelines PowerShell has to parse and compile on every refresh.
+        """
+        patterns = ", ".join(f"'{pattern}'" for pattern in cls.VIRTUAL_PATTERNS)
+        return f"""
+        # One case-insensitive alternation instead of a -like test per pattern
+        $VirtualAdapterRegex = (@({patterns}) | ForEach-Object {{ [regex]::Escape($_) }}) -join '|'
+        
+        function Get-FilteredAdapters {{
+            param([switch]$IncludeVirtual, [switch]$IncludeDown)
+            # .Where() filters the collection in place, without a pipeline per adapter
+            (Get-NetAdapter).Where({{
+                ($IncludeDown -or $_.Status -eq 'Up') -and
+                ($IncludeVirtual -or (
+                    $_.InterfaceType -ne 'Software Loopback' -and
+                    $null -ne $_.MediaType -and
+                    $_.Name -notmatch $VirtualAdapterRegex
+                ))
+            }}) | Select-Object Name, InterfaceIndex, InterfaceDescription, Status, LinkSpeed, InterfaceType, MacAddress
+        }}
+        
+        function Get-AdapterDns {{
+            param([int[]]$InterfaceIndex)
+            Get-DnsClientServerAddress -InterfaceIndex $InterfaceIndex -ErrorAction SilentlyContinue |
+            Where-Object {{ $_.AddressFamily -eq 2 }} |
+            Select-Object InterfaceIndex, ServerAddresses
+        }}
+        
+        function Set-DohServer {{
+            param([string]$ServerAddress, [string]$DohTemplate, [bool]$AutoUpgrade, [bool]$AllowFallback)
+            Remove-DnsClientDohServerAddress -ServerAddress $ServerAddress -ErrorAction SilentlyContinue
+            Add-DnsClientDohServerAddress `
+                -ServerAddress $ServerAddress `
+                -DohTemplate $DohTemplate `
+                -AutoUpgrade:$AutoUpgrade `
+                -AllowFallbackToUdp:$AllowFallback | Out-Null
+        }}
+        
+        function Set-DohEncryption {{
+            param([int]$Value)
+            $path = 'HKLM:\\SYSTEM\\CurrentControlSet\\Services\\Dnscache\\Parameters'
+            if (-not (Test-Path $path)) {{
+                New-Item -Path $path -Force | Out-Null
+            }}
+            $cur = (Get-ItemProperty -Path $path -Name 'EnableDohEbpf' -ErrorAction SilentlyContinue).EnableDohEbpf
+            if ($cur -ne $Value) {{
+                Set-ItemProperty -Path $path -Name 'EnableDohEbpf' -Value $Value -Type DWord
+                # Riavvia il servizio Dnscache per applicare la modifica (solo se il valore cambia)
+                Restart-Service -Name Dnscache -Force -ErrorAction SilentlyContinue
+            }}
+        }}
+        """
+    
+    @classmethod
+    def _find_executable(cls) -> str:
+        """Pick the first available PowerShell from PREFERRED_EXECUTABLES."""
+        for name in cls.PREFERRED_EXECUTABLES:
+            path = shutil.which(name)
+            if path:
+                return path
+        return cls.PREFERRED_EXECUTABLES[-1]
     
     def execute(
         self,
@@ -86,24 +222,21 @@ class PowerShellAdapter:
         try:
             logger.debug(f"Executing PowerShell command: {command[:100]}...")
             
-            completed_process = subprocess.run(
-                ["powershell", "-ExecutionPolicy", "Bypass", "-Command", command],
-                capture_output=capture_output,
-                text=True,
-                timeout=timeout,
-                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0,
-                encoding='utf-8',
-                errors='replace'
-            )
+            try:
+                success, output, error = self._pool.run(command, timeout)
+            except RuntimeError as e:
+                # The session host died; don't fail the user's action because of it
+                logger.warning(f"{e}, running command in a one-shot PowerShell process")
+                success, output, error = self._run_once(command, timeout)
             
-            if completed_process.returncode == 0:
-                output = completed_process.stdout.strip() if capture_output else ""
+            if success:
+                output = output.strip() if capture_output else ""
                 logger.debug(f"Command successful. Output length: {len(output)}")
                 return True, output
             else:
-                error = completed_process.stderr.strip() if capture_output else "Command failed"
+                error = error.strip() if capture_output else "Command failed"
                 self.last_error = error
-                logger.error(f"PowerShell command failed (code {completed_process.returncode}): {error}")
+                logger.error(f"PowerShell command failed: {error}")
                 return False, self._format_error(error)
                 
         except subprocess.TimeoutExpired:
@@ -124,24 +257,33 @@ class PowerShellAdapter:
             logger.error(f"PowerShell execution error: {e}")
             return False, error_msg
     
+    def _run_once(self, command: str, timeout: int) -> Tuple[bool, str, str]:
+        """Run a command in its own PowerShell process (fallback when the session is unavailable)."""
+        completed_process = subprocess.run(
+            [self.executable, *POWERSHELL_FLAGS, "-Command", self._functions_script + command],
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0,
+            encoding='utf-8',
+            errors='replace'
+        )
+        return completed_process.returncode == 0, completed_process.stdout, completed_process.stderr
+    
     def _format_error(self, error: str) -> str:
         """Format PowerShell error message for user display."""
         if not error:
             return "Unknown error occurred"
         
         # Extract meaningful error messages
-        if "access is denied" in error.lower():
-            return "Access denied. Administrator privileges required."
-        elif "does not exist" in error.lower():
-            return "Network adapter not found or unavailable."
-        elif "parameter is incorrect" in error.lower():
-            return "Invalid DNS server address or configuration."
-        elif "not supported" in error.lower():
-            return "Operation not supported on this Windows version."
-        else:
-            # Return first meaningful line
-            lines = [line.strip() for line in error.split('\n') if line.strip()]
-            return lines[0] if lines else error
+        lowered = error.lower()
+        for fragment, message in self._ERROR_MESSAGES:
+            if fragment in lowered:
+                return message
+        
+        # Return first meaningful line
+        lines = [line.strip() for line in error.split('\n') if line.strip()]
+        return lines[0] if lines else error
     
     def get_network_adapters(
         self,
@@ -158,24 +300,34 @@ class PowerShellAdapter:
         Returns:
             List of NetworkAdapter objects
         """
-        # Build filter conditions
-        conditions = []
-        if not include_down:
-            conditions.append("$_.Status -eq 'Up'")
-        
-        if not include_virtual:
-            for pattern in self.VIRTUAL_PATTERNS:
-                conditions.append(f"$_.Name -notlike '*{pattern}*'")
-            conditions.append("$_.InterfaceType -ne 'Software Loopback'")
-            conditions.append("$_.MediaType -ne $null")
+        key = (include_virtual, include_down)
+        cached = self._adapter_cache.get(key)
+        if cached and time.monotonic() - cached[0] < self.CACHE_TTL:
+            return list(cached[1])
         
-        where_clause = " -and ".join(conditions) if conditions else "$true"
+        adapters = self._query_network_adapters(include_virtual, include_down)
+        if adapters:
+            self._adapter_cache[key] = (time.monotonic(), adapters)
+        return list(adapters)
+    
+    def _query_network_adapters(self, include_virtual: bool, include_down: bool) -> List[NetworkAdapter]:
+        """Enumerate network adapters, bypassing the cache."""
+        # Fast path: one in-process IP Helper call instead of a PowerShell round trip
+        native = iphlpapi.get_adapters()
+        if native is not None:
+            data = [
+                item for item in native
+                if self._native_adapter_matches(item, include_virtual, include_down)
+            ]
+            adapters = self._build_adapters(data)
+            logger.info(f"Found {len(adapters)} network adapters")
+            return adapters
         
-        command = f"""
-        @(Get-NetAdapter | Where-Object {{ {where_clause} }} | 
-        Select-Object Name, InterfaceIndex, InterfaceDescription, Status, LinkSpeed, InterfaceType, MacAddress) | 
-        ConvertTo-Json
-        """
+        # Get-FilteredAdapters is defined once per session, see _session_functions
+        command = (
+            f"@(Get-FilteredAdapters -IncludeVirtual:${include_virtual} -IncludeDown:${include_down}) | "
+            "ConvertTo-Csv -NoTypeInformation"
+        )
         
         success, output = self.execute(command)
         
@@ -184,53 +336,150 @@ class PowerShellAdapter:
             return []
         
         try:
-            data = json.loads(output) if output else []
+            # Flat records: CSV is cheaper to emit and parse than JSON, and always a list.
+            # ConvertTo-Csv writes $null as an empty field.
+            data = [
+                {key: value if value != '' else None for key, value in row.items()}
+                for row in csv.DictReader(io.StringIO(output))
+            ]
             
-            # PowerShell returns dict for single item, list for multiple
-            if isinstance(data, dict):
-                data = [data]
-            
-            adapters = []
-            for item in data:
-                adapter_type = self._detect_interface_type(
-                    item.get('Name', ''),
-                    item.get('InterfaceDescription', ''),
-                    item.get('InterfaceType', '')
-                )
-                
-                adapter = NetworkAdapter(
-                    name=item.get('Name', 'Unknown'),
-                    index=str(item.get('InterfaceIndex', '')),
-                    description=item.get('InterfaceDescription', ''),
-                    status=item.get('Status', 'Unknown'),
-                    link_speed=item.get('LinkSpeed'),
-                    interface_type=adapter_type,
-                    is_physical=adapter_type == InterfaceType.PHYSICAL,
-                    mac_address=item.get('MacAddress')
-                )
-                adapters.append(adapter)
+            adapters = self._build_adapters(data)
             
             logger.info(f"Found {len(adapters)} network adapters")
             return adapters
             
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse adapter JSON: {e}")
+        except csv.Error as e:
+            logger.error(f"Failed to parse adapter CSV: {e}")
             return []
         except Exception as e:
             logger.error(f"Error processing adapters: {e}")
             return []
     
-    def _detect_interface_type(self, name: str, description: str, iface_type: str) -> InterfaceType:
+    def get_adapters_with_dns(
+        self,
+        include_virtual: bool = False,
+        include_down: bool = False
+    ) -> List[Tuple[NetworkAdapter, List[str]]]:
+        """
+        Get network adapters together with their DNS servers in one query.
+        
+        Also refreshes the adapter and DNS caches, so follow-up calls to
+        get_network_adapters and get_dns_servers_bulk need no round trip.
+        
+        Args:
+            include_virtual: Include virtual adapters (VMware, VirtualBox, etc.)
+            include_down: Include disconnected adapters
+            
+        Returns:
+            List of (NetworkAdapter, DNS server addresses) pairs
+        """
+        native = iphlpapi.get_adapters()
+        if native is not None:
+            data = [
+                item for item in native
+                if self._native_adapter_matches(item, include_virtual, include_down)
+            ]
+        else:
+            data = self._query_adapters_with_dns(include_virtual, include_down)
+        
+        adapters = self._build_adapters(data)
+        now = time.monotonic()
+        if adapters:
+            self._adapter_cache[(include_virtual, include_down)] = (now, adapters)
+        
+        result = []
+        for adapter, item in zip(adapters, data):
+            servers = item.get('DnsServers') or []
+            self._dns_cache[adapter.index] = (now, servers)
+            result.append((adapter, list(servers)))
+        
+        logger.info(f"Found {len(adapters)} network adapters")
+        return result
+    
+    def _query_adapters_with_dns(self, include_virtual: bool, include_down: bool) -> List[Dict[str, Any]]:
+        """Run Get-FilteredAdapters and Get-AdapterDns in one script, adding a DnsServers field."""
+        command = f"""
+        $adapters = @(Get-FilteredAdapters -IncludeVirtual:${include_virtual} -IncludeDown:${include_down})
+        $dns = @{{}}
+        if ($adapters.Count) {{
+            foreach ($row in @(Get-AdapterDns -InterfaceIndex $adapters.InterfaceIndex)) {{
+                $dns["$($row.InterfaceIndex)"] = @($row.ServerAddresses)
+            }}
+        }}
+        ConvertTo-Json -Depth 3 -Compress -InputObject @($adapters | ForEach-Object {{
+            $_ | Add-Member -NotePropertyName DnsServers -NotePropertyValue $dns["$($_.InterfaceIndex)"] -PassThru
+        }})
+        """
+        
+        success, output = self.execute(command)
+        
+        if not success:
+            logger.error(f"Failed to get network adapters: {output}")
+            return []
+        
+        try:
+            data = json_loads(output) if output else []
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse adapter JSON: {e}")
+            return []
+        
+        # PowerShell returns dict for single item, list for multiple
+        return [data] if isinstance(data, dict) else data
+    
+    def _native_adapter_matches(
+        self,
+        item: Dict[str, Any],
+        include_virtual: bool,
+        include_down: bool
+    ) -> bool:
+        """Apply the Get-NetAdapter filter of get_network_adapters to a native adapter entry."""
+        if not include_down and item['Status'] != 'Up':
+            return False
+        
+        if not include_virtual:
+            if self._VIRTUAL_RE.search(item['Name']):
+                return False
+            # Loopback and tunnel pseudo-interfaces have no media type
+            if item['InterfaceType'] in (iphlpapi.IF_TYPE_SOFTWARE_LOOPBACK, iphlpapi.IF_TYPE_TUNNEL):
+                return False
+        
+        return True
+    
+    def _build_adapters(self, data: List[Dict[str, Any]]) -> List[NetworkAdapter]:
+        """Convert adapter entries (Get-NetAdapter JSON or native) to NetworkAdapter objects."""
+        # Bound once, this runs for every adapter on every refresh
+        detect = self._detect_interface_type
+        physical = InterfaceType.PHYSICAL
+        return [
+            NetworkAdapter(
+                name=name,
+                index=str(index),
+                description=description,
+                status=status,
+                link_speed=link_speed,
+                interface_type=(adapter_type := detect(name, description, iface_type)),
+                is_physical=adapter_type is physical,
+                mac_address=mac_address
+            )
+            for name, index, description, status, link_speed, iface_type, mac_address
+            in map(self._ADAPTER_FIELDS, data)
+        ]
+    
+    # Pure function of its (hashable) inputs and the same adapters recur on every refresh;
+    # cls is part of the key, so subclasses with other patterns get their own entries
+    @classmethod
+    @lru_cache(maxsize=256)
+    def _detect_interface_type(cls, name: str, description: str, iface_type: str) -> InterfaceType:
         """Detect network interface type based on name and description."""
-        combined = f"{name} {description} {iface_type}".lower()
+        combined = f"{name} {description} {iface_type}"
         
-        if 'loopback' in combined:
+        if cls._LOOPBACK_RE.search(combined):
             return InterfaceType.LOOPBACK
-        elif any(pattern.lower() in combined for pattern in ['vpn', 'ras', 'pptp', 'l2tp']):
+        elif cls._VPN_RE.search(combined):
             return InterfaceType.VPN
-        elif 'tap' in combined or 'tun' in combined:
+        elif cls._TAP_RE.search(combined):
             return InterfaceType.TAP
-        elif any(pattern.lower() in combined for pattern in self.VIRTUAL_PATTERNS):
+        elif cls._VIRTUAL_RE.search(combined):
             return InterfaceType.VIRTUAL
         else:
             return InterfaceType.PHYSICAL
@@ -245,36 +494,117 @@ class PowerShellAdapter:
         Returns:
             List of DNS server addresses (empty if DHCP)
         """
-        command = f"""
-        Get-DnsClientServerAddress -InterfaceIndex {interface_index} | 
-        Where-Object {{$_.AddressFamily -eq 2}} | 
-        Select-Object ServerAddresses | 
-        ConvertTo-Json
+        return self.get_dns_servers_bulk([interface_index]).get(str(interface_index), [])
+    
+    def get_dns_servers_bulk(self, interface_indexes: List[str]) -> Dict[str, List[str]]:
+        """
+        Get current DNS servers for several interfaces in one PowerShell call.
+        
+        Args:
+            interface_indexes: Network interface indexes
+        
+        Returns:
+            Dict of interface index to DNS server addresses (empty list if DHCP)
         """
+        now = time.monotonic()
+        result: Dict[str, List[str]] = {}
+        missing = []
+        for index in map(str, interface_indexes):
+            cached = self._dns_cache.get(index)
+            if cached and now - cached[0] < self.CACHE_TTL:
+                result[index] = list(cached[1])
+            else:
+                missing.append(index)
+        
+        if missing:
+            fetched = self._query_dns_servers_bulk(missing)
+            now = time.monotonic()
+            for index, servers in fetched.items():
+                self._dns_cache[index] = (now, servers)
+            result.update((index, list(fetched[index])) for index in missing)
+        
+        return result
+    
+    def _query_dns_servers_bulk(self, interface_indexes: List[str]) -> Dict[str, List[str]]:
+        """Query DNS servers of several interfaces, bypassing the cache."""
+        result: Dict[str, List[str]] = {str(index): [] for index in interface_indexes}
+        if not result:
+            return result
+        
+        try:
+            index_list = ",".join(str(int(index)) for index in result)
+        except ValueError:
+            logger.error(f"Invalid interface index in {list(result)}")
+            return result
+        
+        native = self._native_dns_servers()
+        if native is not None:
+            return {index: native.get(index, []) for index in result}
+        
+        # Get-AdapterDns is defined once per session, see _session_functions
+        command = f"@(Get-AdapterDns -InterfaceIndex {index_list}) | ConvertTo-Json -Compress"
         
         success, output = self.execute(command)
         
         if not success:
-            logger.error(f"Failed to get DNS servers for interface {interface_index}")
-            return []
+            logger.error(f"Failed to get DNS servers for interfaces {index_list}")
+            return result
         
         try:
-            if not output:
-                return []
+            data = json_loads(output) if output else []
             
-            data = json.loads(output)
-            
-            # Handle both single dict and list of dicts
+            # PowerShell returns dict for single item, list for multiple
             if isinstance(data, dict):
-                return data.get('ServerAddresses', [])
-            elif isinstance(data, list) and len(data) > 0:
-                return data[0].get('ServerAddresses', [])
+                data = [data]
             
-            return []
+            for item in data:
+                result[str(item.get('InterfaceIndex', ''))] = item.get('ServerAddresses') or []
             
-        except (json.JSONDecodeError, KeyError, IndexError) as e:
+            return result
+        
+        except (json.JSONDecodeError, AttributeError) as e:
             logger.error(f"Failed to parse DNS servers: {e}")
-            return []
+            return result
+    
+    def _native_dns_servers(self) -> Optional[Dict[str, List[str]]]:
+        """Get IPv4 DNS servers of all interfaces via the IP Helper API, or None if unavailable."""
+        adapters = iphlpapi.get_adapters()
+        if adapters is None:
+            return None
+        return {str(item['InterfaceIndex']): item['DnsServers'] for item in adapters}
+    
+    @staticmethod
+    def quote(value: str) -> str:
+        """
+        Quote a value as a PowerShell single-quoted string literal.
+        
+        Single-quoted strings are not expanded, so only the quote characters need escaping;
+        PowerShell also treats the typographic single quotes as quotes.
+        """
+        for quote_char in "'\u2018\u2019\u201a\u201b":
+            value = value.replace(quote_char, quote_char * 2)
+        return f"'{value}'"
+    
+    @staticmethod
+    def format_addresses(addresses: List[str]) -> str:
+        """
+        Format IP addresses as the items of a PowerShell array literal.
+        
+        Args:
+            addresses: IPv4/IPv6 address strings
+            
+        Returns:
+            Comma-separated single-quoted addresses, e.g. "'1.1.1.1','1.0.0.1'"
+            
+        Raises:
+            ValueError: If an entry is not a valid IP address or carries a scope ID
+        """
+        stripped = [address.strip() for address in addresses]
+        for address in stripped:
+            # ip_address accepts any text after '%' in an IPv6 scope ID; DNS servers never need one
+            if getattr(ipaddress.ip_address(address), 'scope_id', None) is not None:
+                raise ValueError(f"Scoped IPv6 address is not allowed: {address}")
+        return ",".join(PowerShellAdapter.quote(address) for address in stripped)
     
     def set_dns_servers(
         self,
@@ -297,14 +627,17 @@ class PowerShellAdapter:
             return False, "No DNS servers provided"
         
         # Format DNS addresses for PowerShell
-        formatted_dns = ",".join([f'"{dns.strip()}"' for dns in dns_servers])
-        validate_flag = "-Validate" if validate else ""
-        
-        command = f"""
-        Set-DnsClientServerAddress -InterfaceIndex {interface_index} -ServerAddresses ({formatted_dns}) {validate_flag}
-        """
+        try:
+            command = self._SET_DNS_TEMPLATE.format(
+                index=int(interface_index),
+                addresses=self.format_addresses(dns_servers),
+                validate=" -Validate" if validate else ""
+            )
+        except ValueError as e:
+            return False, str(e)
         
         success, output = self.execute(command)
+        self.invalidate_cache(interface_index)
         
         if success:
             logger.info(f"Set DNS servers for interface {interface_index}: {dns_servers}")
@@ -326,6 +659,7 @@ class PowerShellAdapter:
         command = f"Set-DnsClientServerAddress -InterfaceIndex {interface_index} -ResetServerAddresses"
         
         success, output = self.execute(command)
+        self.invalidate_cache(interface_index)
         
         if success:
             logger.info(f"Reset DNS to DHCP for interface {interface_index}")
@@ -361,6 +695,14 @@ class PowerShellAdapter:
         Returns:
             Tuple of (success, message)
         """
+        # Fast path: DnsFlushResolverCache in-process, no ipconfig.exe to start
+        native = dnsapi.flush_resolver_cache()
+        if native is not None:
+            if native[0]:
+                logger.info("DNS cache flushed successfully")
+                return native
+            logger.warning(f"DnsFlushResolverCache failed ({native[1]}), falling back to ipconfig")
+        
         # Use ipconfig for cache flush (more reliable than PowerShell)
         try:
             result = subprocess.run(
@@ -382,6 +724,29 @@ class PowerShellAdapter:
             logger.error(f"Failed to flush DNS cache: {e}")
             return False, str(e)
     
+    def invalidate_cache(self, interface_index: Optional[str] = None) -> None:
+        """
+        Drop cached adapter and DNS data.
+        
+        Args:
+            interface_index: Only forget the DNS servers of this interface. Clears everything if None.
+        """
+        if interface_index is None:
+            self._adapter_cache.clear()
+            self._dns_cache.clear()
+        else:
+            self._dns_cache.pop(str(interface_index), None)
+    
     def get_last_error(self) -> Optional[str]:
         """Get the last error message."""
         return self.last_error
+
+    def close(self) -> None:
+        """Shut down the persistent PowerShell sessions."""
+        self._pool.close()
+    
+    def __enter__(self) -> "PowerShellAdapter":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,259 @@
+"""Persistent PowerShell host shared by all commands of an adapter."""
+
+import atexit
+import base64
+import logging
+import queue
+import subprocess
+import threading
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Startup switches for every powershell.exe launch: skip the user profile and
+# banner, never prompt, and do not let the execution policy block our scripts
+POWERSHELL_FLAGS = (
+    "-NoProfile", "-NonInteractive", "-NoLogo", "-ExecutionPolicy", "Bypass"
+)
+
+# Prefix of every response line written by the host loop
+RESPONSE_MARKER = b"__DNSCHANGER__"
+
+# Host loop run inside the long-lived powershell.exe. Each request is one line of
+# base64 (UTF-8) script text; each script runs in a local scope of a reusable
+# runspace and the answer is written back as a single line:
+#   __DNSCHANGER__ <0|1> <base64 stdout> <base64 errors>
+# A request prefixed with "global " runs in the runspace's global scope instead,
+# so the functions it defines stay available to later requests.
+# Like "powershell -Command" (the one-shot fallback), a script fails on a terminating
+# error or when its last statement fails ($? false); non-terminating errors of earlier
+# statements are reported but do not fail it.
+HOST_SCRIPT = r"""
+$utf8 = New-Object System.Text.UTF8Encoding $false
+$runspace = [runspacefactory]::CreateRunspace()
+$runspace.Open()
+$trailer = "`n" + '$global:__DNSCHANGER_OK = $?'
+while ($true) {
+    $line = [Console]::In.ReadLine()
+    if ($null -eq $line -or $line -eq 'exit') { break }
+    $useLocalScope = $true
+    if ($line.StartsWith('global ')) {
+        $line = $line.Substring(7)
+        $useLocalScope = $false
+    }
+    $ps = [powershell]::Create()
+    $ps.Runspace = $runspace
+    $ok = $true
+    $out = ''
+    $err = ''
+    try {
+        $script = $utf8.GetString([Convert]::FromBase64String($line))
+        $runspace.SessionStateProxy.SetVariable('__DNSCHANGER_OK', $true)
+        $result = $ps.AddScript($script + $trailer, $useLocalScope).AddCommand('Out-String').Invoke()
+        $out = -join $result
+        $ok = [bool]$runspace.SessionStateProxy.GetVariable('__DNSCHANGER_OK')
+        if ($ps.Streams.Error.Count -gt 0) {
+            $err = ($ps.Streams.Error | ForEach-Object { $_.ToString() }) -join "`n"
+        }
+        if (-not $ok -and -not $err) { $err = 'Command failed' }
+    } catch {
+        $ok = $false
+        $ex = $_.Exception
+        if ($ex.InnerException) { $ex = $ex.InnerException }
+        $err = $ex.Message
+    } finally {
+        $ps.Dispose()
+    }
+    $status = if ($ok) { '0' } else { '1' }
+    [Console]::Out.WriteLine(
+        '__DNSCHANGER__ ' + $status + ' ' +
+        [Convert]::ToBase64String($utf8.GetBytes($out)) + ' ' +
+        [Convert]::ToBase64String($utf8.GetBytes($err))
+    )
+    [Console]::Out.Flush()
+}
+$runspace.Close()
+"""
+
+
+class PowerShellSession:
+    """Runs scripts in one long-lived PowerShell process instead of one process per call."""
+    
+    # Seconds allowed for the init script when a host starts
+    INIT_TIMEOUT = 30
+    
+    def __init__(self, executable: str = "powershell", init_script: str = ""):
+        """
+        Initialize PowerShell session.
+        
+        Args:
+            executable: PowerShell executable to host the session
+            init_script: Script run once in global scope whenever the host (re)starts,
+                e.g. to define functions that later scripts call
+        """
+        self.executable = executable
+        self.init_script = init_script
+        self._process: Optional[subprocess.Popen] = None
+        self._responses: Optional[queue.Queue] = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+    
+    def _start(self) -> None:
+        """Start the PowerShell host process and its response reader."""
+        encoded = base64.b64encode(HOST_SCRIPT.encode('utf-16-le')).decode('ascii')
+        
+        self._process = subprocess.Popen(
+            [self.executable, *POWERSHELL_FLAGS, "-EncodedCommand", encoded],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
+        )
+        self._responses = queue.Queue()
+        
+        threading.Thread(
+            target=self._read_responses,
+            args=(self._process.stdout, self._responses),
+            daemon=True
+        ).start()
+        logger.info(f"Started persistent PowerShell session ({self.executable}, pid {self._process.pid})")
+        
+        if self.init_script:
+            ok, _, err = self._request(b"global " + self._encode(self.init_script), self.INIT_TIMEOUT)
+            if not ok:
+                logger.error(f"PowerShell session init script failed: {err}")
+    
+    @staticmethod
+    def _read_responses(stream, responses: queue.Queue) -> None:
+        """Forward protocol lines from the host's stdout; None signals EOF."""
+        for line in stream:
+            if line.startswith(RESPONSE_MARKER):
+                responses.put(line)
+        responses.put(None)
+    
+    def is_alive(self) -> bool:
+        """Check if the host process is running."""
+        return self._process is not None and self._process.poll() is None
+    
+    def run(self, script: str, timeout: float) -> Tuple[bool, str, str]:
+        """
+        Run a script in the session.
+        
+        Args:
+            script: PowerShell script text
+            timeout: Seconds to wait for the script to finish
+        
+        Returns:
+            Tuple of (success, output, error)
+        
+        Raises:
+            FileNotFoundError: PowerShell executable not found
+            subprocess.TimeoutExpired: Script did not finish in time (the session is restarted)
+        """
+        request = self._encode(script)
+        
+        with self._lock:
+            if not self.is_alive():
+                self._start()
+            return self._request(request, timeout)
+    
+    @staticmethod
+    def _encode(script: str) -> bytes:
+        """Encode a script as a single protocol line."""
+        return base64.b64encode(script.encode('utf-8'))
+    
+    def _request(self, request: bytes, timeout: float) -> Tuple[bool, str, str]:
+        """Send one protocol line and wait for its response. Caller holds the lock."""
+        try:
+            self._process.stdin.write(request + b"\n")
+            self._process.stdin.flush()
+            line = self._responses.get(timeout=timeout)
+        except queue.Empty:
+            # The host is stuck on this script; drop it so the next call starts clean
+            self._kill()
+            raise subprocess.TimeoutExpired(self.executable, timeout)
+        except OSError:
+            self._kill()
+            raise RuntimeError("PowerShell session terminated unexpectedly")
+        
+        if line is None:
+            self._kill()
+            raise RuntimeError("PowerShell session terminated unexpectedly")
+        
+        # The pipe is binary: base64 decodes straight from the bytes read, and the
+        # payload is transcoded to str once (the host writes CRLF line ends)
+        _, status, out, err = line.rstrip(b"\r\n").split(b" ")
+        return (
+            status == b"0",
+            base64.b64decode(out).decode('utf-8', errors='replace') if out else "",
+            base64.b64decode(err).decode('utf-8', errors='replace') if err else ""
+        )
+    
+    def _kill(self) -> None:
+        """Terminate the host process immediately."""
+        if self._process is not None:
+            try:
+                self._process.kill()
+                self._process.wait(timeout=5)
+            except Exception as e:
+                logger.debug(f"Error killing PowerShell session: {e}")
+        self._process = None
+    
+    def close(self) -> None:
+        """Ask the host process to exit, killing it if it does not."""
+        # A command may still hold the lock (e.g. at interpreter exit); don't wait on it
+        acquired = self._lock.acquire(timeout=2)
+        try:
+            if not self.is_alive():
+                self._process = None
+                return
+            
+            if not acquired:
+                self._kill()
+                return
+            
+            try:
+                self._process.stdin.write(b"exit\n")
+                self._process.stdin.flush()
+                self._process.wait(timeout=2)
+                self._process = None
+            except Exception:
+                self._kill()
+            
+            logger.debug("Closed persistent PowerShell session")
+        finally:
+            if acquired:
+                self._lock.release()
+
+
+class PowerShellSessionPool:
+    """Fixed-size pool of sessions so independent commands can run in parallel."""
+    
+    def __init__(self, size: int, executable: str = "powershell", init_script: str = ""):
+        """
+        Initialize PowerShell session pool.
+        
+        Args:
+            size: Maximum number of concurrent PowerShell hosts
+            executable: PowerShell executable to host the sessions
+            init_script: Script run once by each host when it starts
+        """
+        self._sessions = [PowerShellSession(executable, init_script) for _ in range(max(1, size))]
+        # LIFO so sequential callers keep reusing the warm session; extra hosts
+        # are only started (lazily, on first run) when commands overlap
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        for session in reversed(self._sessions):
+            self._idle.put(session)
+    
+    def run(self, script: str, timeout: float) -> Tuple[bool, str, str]:
+        """Run a script on the first idle session (see PowerShellSession.run)."""
+        session = self._idle.get()
+        try:
+            return session.run(script, timeout)
+        finally:
+            self._idle.put(session)
+    
+    def close(self) -> None:
+        """Close every session in the pool."""
+        for session in self._sessions:
+            session.close()
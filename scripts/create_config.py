@@ -6,14 +6,18 @@ Interactive tool to create custom DNS provider configurations.
 Usage: python scripts/create_config.py
 """
 
+from __future__ import annotations
+
 import sys
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from models.dns_provider import DNSProvider, DNSPolicy
-from core.dns_loader import DNSLoader
+# pydantic and the loader are only needed once the prompts are answered
+if TYPE_CHECKING:
+    from models.dns_provider import DNSProvider
 
 
 def get_input(prompt: str, default: str = None) -> str:
@@ -48,6 +52,8 @@ def get_list(prompt: str) -> list:
 
 def create_provider_interactive() -> DNSProvider:
     """Create a DNS provider interactively."""
+    from models.dns_provider import DNSProvider, DNSPolicy
+    
     print("\n" + "=" * 60)
     print("Create New DNS Provider")
     print("=" * 60)
@@ -164,6 +170,8 @@ def main():
             return
     
     # Export
+    from core.dns_loader import DNSLoader
+    
     loader = DNSLoader()
     success = loader.export_to_yaml(output_path, providers)
     
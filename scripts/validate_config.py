@@ -13,8 +13,6 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from core.dns_loader import DNSLoader
-
 
 def validate_config(config_path: Path) -> bool:
     """
@@ -33,7 +31,9 @@ def validate_config(config_path: Path) -> bool:
         print(f"❌ Error: File not found: {config_path}")
         return False
     
-    # Load configuration
+    # Load configuration (imported here so --help stays fast)
+    from core.dns_loader import DNSLoader
+    
     loader = DNSLoader(config_dir=config_path.parent)
     providers = loader.load_providers()
     
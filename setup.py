@@ -39,6 +39,9 @@ setup(
             "flake8>=6.0.0",
             "mypy>=1.0.0",
         ],
+        "fast": [
+            "orjson>=3.9.0",
+        ],
         "build": [
             "pyinstaller>=5.0.0",
             "nuitka>=1.5.0",
@@ -0,0 +1,60 @@
+"""Tests for the IP Helper API structure decoding."""
+
+import ctypes
+import socket
+
+from ps import iphlpapi
+from ps.iphlpapi import (
+    AF_INET,
+    IP_ADAPTER_ADDRESSES,
+    IP_ADAPTER_DNS_SERVER_ADDRESS,
+    SOCKADDR,
+)
+
+
+def _sockaddr_in(address):
+    """Build a sockaddr_in with port 0, as GetAdaptersAddresses reports DNS servers."""
+    sockaddr = SOCKADDR()
+    sockaddr.sa_family = AF_INET
+    packed = bytes(2) + socket.inet_aton(address) + bytes(8)
+    sockaddr.sa_data = (ctypes.c_ubyte * 14)(*packed)
+    return sockaddr
+
+
+def _dns_chain(addresses):
+    """Link DNS server nodes like the native list; keep the result alive while reading."""
+    sockaddrs = [_sockaddr_in(address) for address in addresses]
+    nodes = [IP_ADAPTER_DNS_SERVER_ADDRESS() for _ in addresses]
+    for node, sockaddr in zip(nodes, sockaddrs):
+        node.Address.lpSockaddr = ctypes.pointer(sockaddr)
+        node.Address.iSockaddrLength = ctypes.sizeof(sockaddr)
+    for node, following in zip(nodes, nodes[1:]):
+        node.Next = ctypes.pointer(following)
+    return nodes, sockaddrs
+
+
+def test_ipv4_dns_servers_reads_zero_port_sockaddr():
+    """DNS sockaddrs start with a zero port and must not be cut at the NUL byte."""
+    nodes, _ = _dns_chain(['1.1.1.1', '8.8.4.4'])
+    adapter = IP_ADAPTER_ADDRESSES()
+    adapter.FirstDnsServerAddress = ctypes.pointer(nodes[0])
+    
+    assert iphlpapi._ipv4_dns_servers(adapter) == ['1.1.1.1', '8.8.4.4']
+
+
+def test_decode_adapters_includes_dns_servers():
+    """Test the adapter chain is converted to Get-NetAdapter shaped dicts."""
+    nodes, _ = _dns_chain(['9.9.9.9'])
+    adapter = IP_ADAPTER_ADDRESSES()
+    adapter.IfIndex = 12
+    adapter.FriendlyName = 'Ethernet'
+    adapter.OperStatus = 1
+    adapter.FirstDnsServerAddress = ctypes.pointer(nodes[0])
+    
+    decoded = iphlpapi._decode_adapters(ctypes.pointer(adapter))
+    
+    assert len(decoded) == 1
+    assert decoded[0]['Name'] == 'Ethernet'
+    assert decoded[0]['InterfaceIndex'] == 12
+    assert decoded[0]['Status'] == 'Up'
+    assert decoded[0]['DnsServers'] == ['9.9.9.9']
@@ -1,10 +1,17 @@
 """Tests for DNS loader functionality."""
 
+import copy
 import pytest
+import json
 import tempfile
 import yaml
 from pathlib import Path
 
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+
 from core.dns_loader import DNSLoader
 from models.dns_provider import DNSProvider, DNSPolicy
 
@@ -16,36 +23,46 @@ def temp_config_dir():
         yield Path(tmpdir)
 
 
+SAMPLE_YAML_CONFIG = {
+    'version': 1,
+    'providers': [
+        {
+            'name': 'Test DNS',
+            'ipv4': ['8.8.8.8', '8.8.4.4'],
+            'doh_template': 'https://dns.test.com/dns-query',
+            'tags': ['test', 'public'],
+            'policy': {
+                'encrypted_only': True,
+                'autoupgrade': True,
+                'allow_udp_fallback': False
+            }
+        }
+    ]
+}
+
+
 @pytest.fixture
 def sample_yaml_config():
-    """Sample YAML configuration."""
-    return {
-        'version': 1,
-        'providers': [
-            {
-                'name': 'Test DNS',
-                'ipv4': ['8.8.8.8', '8.8.4.4'],
-                'doh_template': 'https://dns.test.com/dns-query',
-                'tags': ['test', 'public'],
-                'policy': {
-                    'encrypted_only': True,
-                    'autoupgrade': True,
-                    'allow_udp_fallback': False
-                }
-            }
-        ]
-    }
+    """Sample YAML configuration (a fresh copy, tests may modify it)."""
+    return copy.deepcopy(SAMPLE_YAML_CONFIG)
 
 
-def test_load_valid_yaml(temp_config_dir, sample_yaml_config):
-    """Test loading valid YAML configuration."""
-    yaml_path = temp_config_dir / 'dns_providers.yaml'
-    
-    with open(yaml_path, 'w') as f:
-        yaml.dump(sample_yaml_config, f)
+@pytest.fixture(scope="session")
+def loaded_loader(tmp_path_factory):
+    """Loader populated once from the sample YAML, for tests that only read it."""
+    config_dir = tmp_path_factory.mktemp('config')
+    with open(config_dir / 'dns_providers.yaml', 'w') as f:
+        yaml.dump(SAMPLE_YAML_CONFIG, f, Dumper=SafeDumper)
     
-    loader = DNSLoader(config_dir=temp_config_dir)
-    providers = loader.load_providers()
+    loader = DNSLoader(config_dir=config_dir)
+    loader.load_providers()
+    return config_dir, loader
+
+
+def test_load_valid_yaml(loaded_loader):
+    """Test loading valid YAML configuration."""
+    _, loader = loaded_loader
+    providers = loader.providers
     
     assert len(providers) == 1
     assert providers[0].name == 'Test DNS'
@@ -75,15 +92,48 @@ def test_load_invalid_yaml(temp_config_dir):
     assert len(loader.get_errors()) > 0
 
 
-def test_get_providers_by_tag(temp_config_dir, sample_yaml_config):
-    """Test filtering providers by tag."""
-    yaml_path = temp_config_dir / 'dns_providers.yaml'
+def test_load_valid_json(temp_config_dir, sample_yaml_config):
+    """Test loading valid JSON configuration."""
+    json_path = temp_config_dir / 'dns_providers.json'
+    json_path.write_text(json.dumps(sample_yaml_config))
     
-    with open(yaml_path, 'w') as f:
-        yaml.dump(sample_yaml_config, f)
+    loader = DNSLoader(config_dir=temp_config_dir)
+    providers = loader.load_providers()
+    
+    assert len(providers) == 1
+    assert providers[0].name == 'Test DNS'
+
+
+def test_json_reload_skips_validation(temp_config_dir, sample_yaml_config, monkeypatch):
+    """Test that reloading unchanged JSON content reuses the validated providers."""
+    json_path = temp_config_dir / 'dns_providers.json'
+    json_path.write_text(json.dumps(sample_yaml_config))
+    
+    DNSLoader(config_dir=temp_config_dir).load_providers()
+    
+    def fail(*args, **kwargs):
+        raise AssertionError("unchanged content was validated again")
+    
+    monkeypatch.setattr(DNSLoader, '_validate_and_load', fail)
+    providers = DNSLoader(config_dir=temp_config_dir).load_providers()
+    assert providers[0].name == 'Test DNS'
+
+
+def test_load_invalid_json(temp_config_dir):
+    """Test loading malformed JSON."""
+    json_path = temp_config_dir / 'dns_providers.json'
+    json_path.write_text('{"version": 1, "providers": [')
     
     loader = DNSLoader(config_dir=temp_config_dir)
-    loader.load_providers()
+    providers = loader.load_providers()
+    
+    assert len(providers) == 0
+    assert 'JSON syntax error' in loader.get_errors()[0]
+
+
+def test_get_providers_by_tag(loaded_loader):
+    """Test filtering providers by tag."""
+    _, loader = loaded_loader
     
     test_providers = loader.get_providers_by_tag('test')
     assert len(test_providers) == 1
@@ -92,6 +142,28 @@ def test_get_providers_by_tag(temp_config_dir, sample_yaml_config):
     assert len(nonexistent) == 0
 
 
+def test_get_providers_by_duplicated_tag(temp_config_dir, sample_yaml_config):
+    """Test that a provider repeating a tag is returned only once."""
+    sample_yaml_config['providers'][0]['tags'] = ['test', 'test']
+    
+    yaml_path = temp_config_dir / 'dns_providers.yaml'
+    with open(yaml_path, 'w') as f:
+        yaml.dump(sample_yaml_config, f, Dumper=SafeDumper)
+    
+    loader = DNSLoader(config_dir=temp_config_dir)
+    loader.load_providers()
+    
+    assert len(loader.get_providers_by_tag('test')) == 1
+
+
+def test_get_provider_by_name(loaded_loader):
+    """Test looking up a provider by exact name."""
+    _, loader = loaded_loader
+    
+    assert loader.get_provider_by_name('Test DNS').ipv4 == ['8.8.8.8', '8.8.4.4']
+    assert loader.get_provider_by_name('test dns') is None
+
+
 def test_get_doh_providers(temp_config_dir, sample_yaml_config):
     """Test getting only DoH providers."""
     # Add provider without DoH
@@ -103,7 +175,7 @@ def test_get_doh_providers(temp_config_dir, sample_yaml_config):
     
     yaml_path = temp_config_dir / 'dns_providers.yaml'
     with open(yaml_path, 'w') as f:
-        yaml.dump(sample_yaml_config, f)
+        yaml.dump(sample_yaml_config, f, Dumper=SafeDumper)
     
     loader = DNSLoader(config_dir=temp_config_dir)
     loader.load_providers()
@@ -113,6 +185,59 @@ def test_get_doh_providers(temp_config_dir, sample_yaml_config):
     assert doh_providers[0].name == 'Test DNS'
 
 
+def test_yaml_cache_reused(temp_config_dir, sample_yaml_config):
+    """Test that an unchanged YAML file is served from the sidecar cache."""
+    yaml_path = temp_config_dir / 'dns_providers.yaml'
+    
+    with open(yaml_path, 'w') as f:
+        yaml.dump(sample_yaml_config, f, Dumper=SafeDumper)
+    
+    DNSLoader(config_dir=temp_config_dir).load_providers()
+    assert (temp_config_dir / 'dns_providers.yaml.cache').exists()
+    
+    providers = DNSLoader(config_dir=temp_config_dir).load_providers()
+    assert len(providers) == 1
+    assert providers[0].name == 'Test DNS'
+
+
+def test_yaml_cache_ignored_for_other_schema(temp_config_dir, sample_yaml_config):
+    """Test that a plain-JSON cache written under another cache schema version is not used."""
+    yaml_path = temp_config_dir / 'dns_providers.yaml'
+    
+    with open(yaml_path, 'w') as f:
+        yaml.dump(sample_yaml_config, f, Dumper=SafeDumper)
+    
+    DNSLoader(config_dir=temp_config_dir).load_providers()
+    
+    cache_path = temp_config_dir / 'dns_providers.yaml.cache'
+    cached = json.loads(cache_path.read_text())
+    cached['key'][0] -= 1
+    cached['providers'][0]['name'] = 'Stale DNS'
+    cache_path.write_text(json.dumps(cached))
+    DNSLoader._memo.clear()
+    
+    providers = DNSLoader(config_dir=temp_config_dir).load_providers()
+    assert providers[0].name == 'Test DNS'
+    assert providers[0].policy.encrypted_only is True
+
+
+def test_yaml_cache_invalidated_on_change(temp_config_dir, sample_yaml_config):
+    """Test that editing the YAML file bypasses a stale cache."""
+    yaml_path = temp_config_dir / 'dns_providers.yaml'
+    
+    with open(yaml_path, 'w') as f:
+        yaml.dump(sample_yaml_config, f, Dumper=SafeDumper)
+    
+    DNSLoader(config_dir=temp_config_dir).load_providers()
+    
+    sample_yaml_config['providers'][0]['name'] = 'Renamed DNS'
+    with open(yaml_path, 'w') as f:
+        yaml.dump(sample_yaml_config, f, Dumper=SafeDumper)
+    
+    providers = DNSLoader(config_dir=temp_config_dir).load_providers()
+    assert providers[0].name == 'Renamed DNS'
+
+
 def test_export_to_yaml(temp_config_dir):
     """Test exporting providers to YAML."""
     providers = [
@@ -132,7 +257,7 @@ def test_export_to_yaml(temp_config_dir):
     
     # Verify exported content
     with open(output_path, 'r') as f:
-        data = yaml.safe_load(f)
+        data = yaml.load(f, Loader=SafeLoader)
     
     assert data['version'] == 1
     assert len(data['providers']) == 1
@@ -74,6 +74,33 @@ ValidProvider,1.1.1.1
     assert len(entries) == 3  # Google, ,OnlyComma,, ValidProvider are valid lines parsed
 
 
+def test_parse_legacy_comment_with_quote(temp_dir):
+    """Test that a quote inside a comment does not swallow the following entries."""
+    txt_path = temp_dir / 'dns_list.txt'
+    content = """# "Unbalanced quote, in a comment
+Google,8.8.8.8,8.8.4.4
+Cloudflare,1.1.1.1
+"""
+    txt_path.write_text(content)
+    
+    entries = parse_legacy_dns_file(txt_path)
+    assert entries == [('Google', ['8.8.8.8', '8.8.4.4']), ('Cloudflare', ['1.1.1.1'])]
+
+
+def test_parse_legacy_unbalanced_quote_in_entry(temp_dir, caplog):
+    """Test that an unbalanced quote in an entry only affects its own line."""
+    txt_path = temp_dir / 'dns_list.txt'
+    content = """Google,8.8.8.8,8.8.4.4
+"Broken, 1.1.1.1
+Cloudflare,1.1.1.1,1.0.0.1
+Quad9,9.9.9.9
+"""
+    txt_path.write_text(content)
+    
+    entries = parse_legacy_dns_file(txt_path)
+    assert [name for name, _ in entries] == ['Google', 'Cloudflare', 'Quad9']
+    assert "Skipping invalid line 2" in caplog.text
+
 def test_convert_legacy_to_providers(sample_legacy_file):
     """Test converting legacy entries to providers."""
     entries = parse_legacy_dns_file(sample_legacy_file)
@@ -88,6 +115,29 @@ def test_convert_legacy_to_providers(sample_legacy_file):
     assert 'migrated' in google.tags or 'public' in google.tags
 
 
+def test_convert_detects_provider_by_address():
+    """Test that known resolvers get their DoH template even under a custom name."""
+    providers = convert_legacy_to_providers([('Home', ['1.1.1.1', '1.0.0.1']), ('Office', ['10.0.0.1'])])
+    
+    assert providers[0].doh_template == 'https://cloudflare-dns.com/dns-query'
+    assert providers[1].doh_template is None
+    assert providers[1].tags == ['migrated']
+
+
+def test_convert_skips_invalid_entries():
+    """Test that entries with bad names or addresses are not converted."""
+    entries = [
+        ('Google', ['8.8.8.8']),
+        ('', ['1.1.1.1']),
+        ('Broken', ['1.1.1.1', '256.0.0.1']),
+        ('Words', ['OnlyComma']),
+    ]
+    
+    providers = convert_legacy_to_providers(entries)
+    
+    assert [p.name for p in providers] == ['Google']
+
+
 def test_migrate_txt_to_yaml(temp_dir, sample_legacy_file):
     """Test full migration process."""
     yaml_path = temp_dir / 'dns_providers.yaml'
@@ -39,6 +39,25 @@ def test_invalid_ipv4():
         )
 
 
+def test_address_family_mismatch():
+    """Test that IPv4 and IPv6 lists reject addresses of the other family."""
+    with pytest.raises(ValidationError):
+        DNSProvider(name="Mixed DNS", ipv4=["2001:4860:4860::8888"])
+    
+    with pytest.raises(ValidationError):
+        DNSProvider(name="Mixed DNS", ipv4=["8.8.8.8"], ipv6=["8.8.4.4"])
+    
+    provider = DNSProvider(name="Dual DNS", ipv4=["8.8.8.8"], ipv6=["2001:4860:4860::8888"])
+    assert provider.ipv6 == ["2001:4860:4860::8888"]
+
+
+@pytest.mark.parametrize("address", ["2001:::1", "2001:4860:4860::88888", "fe80::1::2", ""])
+def test_invalid_ipv6(address):
+    """Test validation of invalid IPv6 addresses."""
+    with pytest.raises(ValidationError):
+        DNSProvider(name="Invalid DNS", ipv4=["8.8.8.8"], ipv6=[address])
+
+
 def test_invalid_doh_template():
     """Test validation of invalid DoH template."""
     with pytest.raises(ValidationError):
@@ -71,6 +90,14 @@ def test_provider_list_validation():
     assert len(provider_list.providers) == 2
 
 
+def test_provider_list_reuses_instances():
+    """Test that providers passed to the list are not validated or copied again."""
+    provider = DNSProvider(name="DNS1", ipv4=["8.8.8.8"])
+    
+    provider_list = DNSProviderList(version=1, providers=[provider])
+    assert provider_list.providers[0] is provider
+
+
 def test_duplicate_provider_names():
     """Test that duplicate provider names are rejected."""
     with pytest.raises(ValidationError):
@@ -83,5 +110,17 @@ def test_duplicate_provider_names():
         )
 
 
+def test_duplicate_provider_names_reported_once():
+    """Test that each duplicated name is reported once, in order of appearance."""
+    with pytest.raises(ValidationError, match="Duplicate provider names found: B, A"):
+        DNSProviderList(
+            version=1,
+            providers=[
+                DNSProvider(name=name, ipv4=["8.8.8.8"])
+                for name in ["B", "A", "B", "C", "A", "B"]
+            ]
+        )
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,26 @@
+"""Tests for PowerShell script text building."""
+
+import pytest
+
+from ps.ps_adapter import PowerShellAdapter
+
+
+def test_format_addresses_single_quotes():
+    """Test addresses are emitted as single-quoted, non-expanding literals."""
+    assert PowerShellAdapter.format_addresses(['1.1.1.1', ' 2606:4700::1111']) == "'1.1.1.1','2606:4700::1111'"
+
+
+@pytest.mark.parametrize("address", ['fe80::1%$(calc)', 'fe80::1%eth0', '1.1.1.1; calc', 'not-an-ip'])
+def test_format_addresses_rejects_unsafe_input(address):
+    """Test scoped IPv6 and non-address input never reach the script text."""
+    with pytest.raises(ValueError):
+        PowerShellAdapter.format_addresses([address])
+
+
+def test_format_error_keeps_fragment_priority():
+    """Test access denied wins even when another known phrase appears first."""
+    adapter = PowerShellAdapter.__new__(PowerShellAdapter)
+    error = "The parameter is incorrect.\nAccess is denied."
+    
+    assert adapter._format_error(error) == "Access denied. Administrator privileges required."
+    assert adapter._format_error("Line one\nLine two") == "Line one"
@@ -0,0 +1,64 @@
+"""Tests for DNS verification."""
+
+import subprocess
+
+import pytest
+
+from core.dns_verifier import DNSVerifier, VerificationStatus
+
+
+class FakeAdapter:
+    """Stands in for PowerShellAdapter, answering resolve_dns from a table."""
+    
+    def __init__(self, answers):
+        self.answers = answers
+    
+    def resolve_dns(self, domain, timeout=5):
+        answer = self.answers[domain]
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+DOMAINS = ("example.com", "google.com", "cloudflare.com")
+
+
+def test_verify_all_resolved():
+    """Test that verification succeeds when every domain resolves."""
+    verifier = DNSVerifier(FakeAdapter({domain: (True, "") for domain in DOMAINS}))
+    
+    result = verifier.verify_dns(DOMAINS)
+    
+    assert result.status == VerificationStatus.SUCCESS
+    assert result.successful_domains == list(DOMAINS)
+
+
+def test_verify_all_timed_out():
+    """Test that concurrent lookups that all time out report TIMEOUT, not FAILED."""
+    verifier = DNSVerifier(FakeAdapter({
+        "example.com": (False, "Command timed out after 5 seconds"),
+        "google.com": (False, "google.com : This operation returned because the timeout period expired"),
+        "cloudflare.com": subprocess.TimeoutExpired("powershell", 5),
+    }))
+    
+    result = verifier.verify_dns(DOMAINS)
+    
+    assert result.status == VerificationStatus.TIMEOUT
+    assert result.failed_domains == list(DOMAINS)
+
+
+@pytest.mark.parametrize("answers, expected", [
+    ([(True, ""), (False, "Command timed out after 5 seconds"), (False, "DNS name does not exist")],
+     VerificationStatus.PARTIAL),
+    ([(False, "Command timed out after 5 seconds"), (False, "DNS name does not exist"), (False, "")],
+     VerificationStatus.FAILED),
+])
+def test_verify_status_selection(answers, expected):
+    """Test that TIMEOUT is only reported when no failure had another cause."""
+    verifier = DNSVerifier(FakeAdapter(dict(zip(DOMAINS, answers))))
+    
+    assert verifier.verify_dns(DOMAINS).status == expected
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
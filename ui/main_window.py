@@ -1,19 +1,24 @@
 """Main application window for DNSChanger."""
 
+from __future__ import annotations
+
 import customtkinter as ctk
 import logging
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, List
+from typing import TYPE_CHECKING, Dict, Optional, List, Tuple
 from tkinter import messagebox
 
 from core.dns_loader import DNSLoader
 from core.dns_verifier import DNSVerifier
-from core.migration import migrate_txt_to_yaml, can_migrate
 from ps.ps_adapter import PowerShellAdapter
 from ps.doh_manager import DoHManager
-from models.dns_provider import DNSProvider
+
+# The models (pydantic) load with the providers, migration only when requested
+if TYPE_CHECKING:
+    from models.dns_provider import DNSProvider
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +37,12 @@ SUCCESS_COLOR = ACID_GREEN
 class DNSChangerApp(ctk.CTk):
     """Main DNS Changer application window."""
     
+    # Checkbox toggles within this window (ms) trigger a single status query
+    STATUS_DEBOUNCE_MS = 150
+    
+    # Delay (ms) before settings that failed verification are rolled back
+    ROLLBACK_DELAY_MS = 30_000
+    
     def __init__(self):
         super().__init__()
         
@@ -46,15 +57,46 @@ class DNSChangerApp(ctk.CTk):
         self.dns_loader = DNSLoader()
         self.dns_verifier = DNSVerifier(self.ps_adapter)
         
+        # Fonts used by every provider and status row, created once (they need the Tk root)
+        self._font_name = ctk.CTkFont(size=13, weight="bold")
+        self._font_bold = ctk.CTkFont(weight="bold")
+        self._font_dns = ctk.CTkFont(size=11)
+        self._font_badge = ctk.CTkFont(size=10)
+        self._font_tag = ctk.CTkFont(size=9)
+        
         # State variables
         self.interface_vars = {}
+        # Indexes of the checked interfaces, kept in sync by the checkbox callbacks
+        self._selected_indexes: set = set()
+        self._interface_widgets: Dict[str, ctk.CTkCheckBox] = {}
+        self._no_interfaces_label: Optional[ctk.CTkLabel] = None
+        self._provider_widgets: Dict[str, Tuple[DNSProvider, ctk.CTkFrame]] = {}
         self.selected_provider: Optional[DNSProvider] = None
         self.use_doh_var = ctk.BooleanVar(value=True)
         self.flush_cache_var = ctk.BooleanVar(value=True)
-        self.rollback_timer: Optional[threading.Timer] = None
+        self._rollback_job: Optional[str] = None
+        self._rollback_selected: List[Tuple[int, str]] = []
+        self._status_generation = 0
+        self._status_update_job: Optional[str] = None
         
         self._setup_ui()
         self._load_initial_data()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+    
+    def _on_close(self):
+        """Shut down the PowerShell sessions together with the window."""
+        if self._rollback_job is not None:
+            # Closing must not leave the failed DNS configuration in place; roll back now
+            selected = self._rollback_selected
+            self._cancel_rollback()
+            self._update_status("Rolling back DNS settings before closing...", WARNING_COLOR)
+            self.update_idletasks()
+            try:
+                self._rollback_interfaces(selected)
+            except Exception:
+                logger.exception("Auto-rollback on close failed")
+        self.ps_adapter.close()
+        self.destroy()
     
     def _setup_ui(self):
         """Setup the user interface."""
@@ -98,7 +140,7 @@ class DNSChangerApp(ctk.CTk):
             title_frame,
             text="↻",
             width=30,
-            command=self._refresh_interfaces,
+            command=self._force_refresh_interfaces,
             fg_color=ACID_GREEN,
             text_color=DARK_GRAY,
             hover_color=BUTTON_HOVER_COLOR
@@ -220,22 +262,53 @@ class DNSChangerApp(ctk.CTk):
         )
         self.status_label.grid(row=2, column=0, columnspan=3, pady=10)
     
+    def _run_async(self, worker, on_done, *args, on_error=None):
+        """
+        Run a blocking call off the Tk main thread.
+        
+        Args:
+            worker: Callable executed in a background thread with *args
+            on_done: Callback receiving the worker's result, run on the Tk thread
+            on_error: Callback receiving the exception if the worker fails, run on the
+                Tk thread. Defaults to reporting the error in the status bar.
+        """
+        def runner():
+            try:
+                result = worker(*args)
+            except Exception as e:
+                logger.exception(f"Background task {getattr(worker, '__name__', worker)} failed")
+                self.after(0, on_error or self._on_async_error, e)
+                return
+            self.after(0, on_done, result)
+        
+        threading.Thread(target=runner, daemon=True).start()
+    
+    def _on_async_error(self, error: Exception):
+        """Replace a pending "Loading..." style status with the error of the failed task."""
+        self._update_status(f"❌ Error: {error}", ERROR_COLOR)
+    
     def _load_initial_data(self):
         """Load initial data (interfaces and providers)."""
-        # Check DoH support
-        supported, msg = self.doh_manager.is_supported()
-        if not supported:
-            self.doh_toggle.configure(state="disabled")
-            self.doh_status_label.configure(text="⚠️ " + msg.split('.')[0])
-            self.use_doh_var.set(False)
-        
         # Load providers
         self._load_providers()
         
-        # Load interfaces
-        self._refresh_interfaces()
-        
         self._update_status("Ready", SUCCESS_COLOR)
+        
+        # Check DoH support and load interfaces without blocking the window
+        self._run_async(
+            self.doh_manager.is_supported,
+            self._on_doh_support_checked,
+            on_error=lambda e: self._on_doh_support_checked((False, f"DoH support check failed: {e}"))
+        )
+        self._refresh_interfaces()
+    
+    def _on_doh_support_checked(self, result):
+        """Disable the DoH toggle if DoH is unavailable."""
+        supported, msg = result
+        if not supported:
+            self.doh_toggle.configure(state="disabled")
+            self.doh_status_label.configure(text="⚠️ " + msg.split('.')[0])
+            self.use_doh_var.set(False)
     
     def _load_providers(self):
         """Load DNS providers from configuration."""
@@ -253,20 +326,39 @@ class DNSChangerApp(ctk.CTk):
                 self._update_status(f"Error loading providers: {errors}", ERROR_COLOR)
             return
         
-        # Clear existing providers
-        for widget in self.providers_scroll.winfo_children():
-            widget.destroy()
+        # Rebuild only the rows of providers that were added or changed; names are unique
+        current = {provider.name: provider for provider in providers}
+        for name in set(self._provider_widgets) - set(current):
+            self._provider_widgets.pop(name)[1].destroy()
+        
+        packed = self.providers_scroll.pack_slaves()
+        position = {"before": packed[0]} if packed else {}
         
-        # Add provider buttons
         for provider in providers:
-            self._create_provider_button(provider)
+            entry = self._provider_widgets.get(provider.name)
+            if entry is not None and entry[0] == provider:
+                # Repacking only moves the row, in case the providers were reordered
+                if entry[1] not in position.values():
+                    entry[1].pack_configure(**position)
+                position = {"after": entry[1]}
+                continue
+            
+            btn_frame = self._create_provider_button(provider, position)
+            if entry is not None:
+                # Packed next to the old row first, so the position never points at a destroyed widget
+                entry[1].destroy()
+                if self.selected_provider is not None and self.selected_provider.name == provider.name:
+                    self.selected_provider = provider
+                    btn_frame.configure(fg_color="#3A3A3A")
+            self._provider_widgets[provider.name] = (provider, btn_frame)
+            position = {"after": btn_frame}
         
         logger.info(f"Loaded {len(providers)} DNS providers")
     
-    def _create_provider_button(self, provider: DNSProvider):
-        """Create a provider selection button."""
+    def _create_provider_button(self, provider: DNSProvider, position: Optional[Dict] = None) -> ctk.CTkFrame:
+        """Create a provider selection button, packed at position (pack before/after options)."""
         btn_frame = ctk.CTkFrame(self.providers_scroll, fg_color=DARK_GRAY, corner_radius=5)
-        btn_frame.pack(fill="x", padx=5, pady=3)
+        btn_frame.pack(fill="x", padx=5, pady=3, **(position or {}))
         
         # Provider name and badges
         info_frame = ctk.CTkFrame(btn_frame, fg_color="transparent")
@@ -275,31 +367,29 @@ class DNSChangerApp(ctk.CTk):
         name_label = ctk.CTkLabel(
             info_frame,
             text=provider.name,
-            font=ctk.CTkFont(size=13, weight="bold"),
+            font=self._font_name,
             text_color=TEXT_COLOR,
             anchor="w"
         )
         name_label.pack(side="left")
         
-        # Badges
-        badges_frame = ctk.CTkFrame(info_frame, fg_color="transparent")
-        badges_frame.pack(side="right")
+        # Badges: one label for all tags and no container frame, since every CTk widget is
+        # a canvas redrawn while scrolling. Packed right to left, so the tags go first
+        if provider.tags:
+            ctk.CTkLabel(
+                info_frame,
+                text=" ".join(f"#{tag}" for tag in provider.tags[:3]),  # Show first 3 tags
+                font=self._font_tag,
+                text_color="gray"
+            ).pack(side="right", padx=2)
         
         if provider.doh_template:
             ctk.CTkLabel(
-                badges_frame,
+                info_frame,
                 text="🔒 DoH",
-                font=ctk.CTkFont(size=10),
+                font=self._font_badge,
                 text_color=ACID_GREEN
-            ).pack(side="left", padx=2)
-        
-        for tag in provider.tags[:3]:  # Show first 3 tags
-            ctk.CTkLabel(
-                badges_frame,
-                text=f"#{tag}",
-                font=ctk.CTkFont(size=9),
-                text_color="gray"
-            ).pack(side="left", padx=2)
+            ).pack(side="right", padx=2)
         
         # DNS addresses
         dns_text = ", ".join(provider.ipv4[:2])
@@ -309,7 +399,7 @@ class DNSChangerApp(ctk.CTk):
         ctk.CTkLabel(
             btn_frame,
             text=dns_text,
-            font=ctk.CTkFont(size=11),
+            font=self._font_dns,
             text_color="lightgray",
             anchor="w"
         ).pack(padx=10, pady=(0, 5), anchor="w")
@@ -326,56 +416,150 @@ class DNSChangerApp(ctk.CTk):
         btn_frame.bind("<Button-1>", lambda e: select_provider())
         for child in btn_frame.winfo_children():
             child.bind("<Button-1>", lambda e: select_provider())
+        
+        return btn_frame
+    
+    def _force_refresh_interfaces(self):
+        """Refresh button: bypass the adapter, DNS and DoH state caches."""
+        self.ps_adapter.invalidate_cache()
+        self.doh_manager.invalidate_cache()
+        self._refresh_interfaces()
     
     def _refresh_interfaces(self):
         """Refresh network interfaces list."""
         self._update_status("Loading interfaces...", TEXT_COLOR)
         
-        adapters = self.ps_adapter.get_network_adapters(include_virtual=False, include_down=False)
+        # DNS servers come back in the same query and warm the cache for the status panel
+        self._run_async(
+            lambda: [adapter for adapter, _ in self.ps_adapter.get_adapters_with_dns()],
+            self._on_interfaces_ready
+        )
         
-        # Clear existing
-        for widget in self.interfaces_scroll.winfo_children():
-            widget.destroy()
-        self.interface_vars.clear()
+    def _on_interfaces_ready(self, adapters):
+        """Update the interfaces list, only touching checkboxes whose adapter changed."""
+        current = {adapter.index: adapter for adapter in adapters}
+        
+        # Drop checkboxes of adapters that went away
+        for index in set(self._interface_widgets) - set(current):
+            self._interface_widgets.pop(index).destroy()
+            del self.interface_vars[index]
+            self._selected_indexes.discard(index)
         
         if not adapters:
-            ctk.CTkLabel(
-                self.interfaces_scroll,
-                text="No active network adapters found",
-                text_color=WARNING_COLOR
-            ).pack(pady=20)
+            if self._no_interfaces_label is None:
+                self._no_interfaces_label = ctk.CTkLabel(
+                    self.interfaces_scroll,
+                    text="No active network adapters found",
+                    text_color=WARNING_COLOR
+                )
+                self._no_interfaces_label.pack(pady=20)
             self._update_status("No active adapters found", WARNING_COLOR)
+            self._update_current_status()
             return
         
-        # Add interface checkboxes
+        if self._no_interfaces_label is not None:
+            self._no_interfaces_label.destroy()
+            self._no_interfaces_label = None
+        
+        # New checkboxes are packed next to their neighbours so the list follows adapter order
+        packed = self.interfaces_scroll.pack_slaves()
+        position = {"before": packed[0]} if packed else {}
+        
         for adapter in adapters:
+            text = f"{adapter.display_name}\n{adapter.description}"
+            
+            # Reuse the existing checkbox (and its selection), refreshing its label if needed
+            cb = self._interface_widgets.get(adapter.index)
+            if cb is not None:
+                var, _ = self.interface_vars[adapter.index]
+                self.interface_vars[adapter.index] = (var, adapter.name)
+                if cb.cget("text") != text:
+                    cb.configure(text=text)
+                position = {"after": cb}
+                continue
+            
             var = ctk.StringVar(value="off")
             self.interface_vars[adapter.index] = (var, adapter.name)
             
             cb = ctk.CTkCheckBox(
                 self.interfaces_scroll,
-                text=f"{adapter.display_name}\n{adapter.description}",
+                text=text,
                 variable=var,
                 onvalue=adapter.index,
                 offvalue="off",
-                command=lambda: self._update_current_status(),
+                command=lambda index=adapter.index: self._on_interface_toggled(index),
                 fg_color=ACID_GREEN,
                 hover_color=BUTTON_HOVER_COLOR
             )
-            cb.pack(anchor="w", padx=10, pady=5)
+            cb.pack(anchor="w", padx=10, pady=5, **position)
+            self._interface_widgets[adapter.index] = cb
+            position = {"after": cb}
         
         self._update_status(f"Found {len(adapters)} network interfaces", SUCCESS_COLOR)
         self._update_current_status()
     
+    def _on_interface_toggled(self, index: str):
+        """Track the checkbox state and refresh the status panel."""
+        if self.interface_vars[index][0].get() != "off":
+            self._selected_indexes.add(index)
+        else:
+            self._selected_indexes.discard(index)
+        self._schedule_status_update()
+    
+    def _schedule_status_update(self):
+        """Coalesce rapid checkbox toggles into one status update."""
+        if self._status_update_job is not None:
+            self.after_cancel(self._status_update_job)
+        self._status_update_job = self.after(self.STATUS_DEBOUNCE_MS, self._update_current_status)
+    
     def _update_current_status(self):
         """Update current DNS status display."""
+        # Direct calls (refresh, apply) supersede a pending debounced one
+        if self._status_update_job is not None:
+            self.after_cancel(self._status_update_job)
+            self._status_update_job = None
+        selected = self._get_selected_interfaces()
+        
+        # Results of an older request that finishes late are discarded
+        self._status_generation += 1
+        generation = self._status_generation
+        
+        if not selected:
+            self._on_current_status_ready(generation, [])
+            return
+        
+        self._run_async(
+            lambda: (generation, self._fetch_current_status(selected)),
+            lambda result: self._on_current_status_ready(*result)
+        )
+    
+    def _fetch_current_status(self, selected):
+        """Query DNS servers and DoH state of the selected interfaces (worker thread)."""
+        # One PowerShell round-trip for all selected interfaces
+        dns_by_index = self.ps_adapter.get_dns_servers_bulk([index for index, _ in selected])
+        
+        # Check DoH status (served from the DNS result above and one system query)
+        doh_active = {}
+        if self.doh_manager.doh_supported:
+            configured = [(index, name) for index, name in selected if dns_by_index.get(index)]
+            for doh_state in self.doh_manager.get_all_interface_doh_states(configured):
+                doh_active[doh_state.interface_index] = bool(doh_state.doh_servers)
+        
+        return [
+            (name, dns_by_index.get(index, []), doh_active.get(index, False))
+            for index, name in selected
+        ]
+    
+    def _on_current_status_ready(self, generation, status):
+        """Render the current DNS status of the selected interfaces."""
+        if generation != self._status_generation:
+            return
+        
         # Clear existing
         for widget in self.status_scroll.winfo_children():
             widget.destroy()
         
-        selected = self._get_selected_interfaces()
-        
-        if not selected:
+        if not status:
             ctk.CTkLabel(
                 self.status_scroll,
                 text="No interfaces selected",
@@ -383,44 +567,39 @@ class DNSChangerApp(ctk.CTk):
             ).pack(pady=20)
             return
         
-        for index, name in selected:
+        for name, dns_servers, doh_active in status:
             frame = ctk.CTkFrame(self.status_scroll, fg_color=DARK_GRAY, corner_radius=5)
             frame.pack(fill="x", padx=5, pady=5)
             
             ctk.CTkLabel(
                 frame,
                 text=name,
-                font=ctk.CTkFont(weight="bold"),
+                font=self._font_bold,
                 text_color=ACID_GREEN
             ).pack(anchor="w", padx=10, pady=(5, 0))
             
-            dns_servers = self.ps_adapter.get_dns_servers(index)
-            
             if dns_servers:
                 dns_text = "DNS: " + ", ".join(dns_servers)
                 ctk.CTkLabel(
                     frame,
                     text=dns_text,
                     text_color=TEXT_COLOR,
-                    font=ctk.CTkFont(size=11)
+                    font=self._font_dns
                 ).pack(anchor="w", padx=10, pady=(0, 5))
                 
-                # Check DoH status
-                if self.doh_manager.doh_supported:
-                    doh_state = self.doh_manager.get_interface_doh_state(index, name)
-                    if doh_state.doh_servers:
-                        ctk.CTkLabel(
-                            frame,
-                            text="🔒 DoH Active",
-                            text_color=ACID_GREEN,
-                            font=ctk.CTkFont(size=10)
-                        ).pack(anchor="w", padx=10, pady=(0, 5))
+                if doh_active:
+                    ctk.CTkLabel(
+                        frame,
+                        text="🔒 DoH Active",
+                        text_color=ACID_GREEN,
+                        font=self._font_badge
+                    ).pack(anchor="w", padx=10, pady=(0, 5))
             else:
                 ctk.CTkLabel(
                     frame,
                     text="DNS: Automatic (DHCP)",
                     text_color=WARNING_COLOR,
-                    font=ctk.CTkFont(size=11)
+                    font=self._font_dns
                 ).pack(anchor="w", padx=10, pady=(0, 5))
     
     def _apply_dns(self):
@@ -440,6 +619,9 @@ class DNSChangerApp(ctk.CTk):
         if not messagebox.askyesno("Confirm", msg):
             return
         
+        # A rollback still pending from the previous apply would undo this one
+        self._cancel_rollback()
+        
         self.apply_btn.configure(state="disabled")
         self._update_status("Applying DNS settings...", TEXT_COLOR)
         
@@ -447,40 +629,41 @@ class DNSChangerApp(ctk.CTk):
         start_apply_time = time.time()
         
         # Run in thread to avoid blocking UI
-        threading.Thread(target=self._apply_dns_thread, args=(selected, start_apply_time), daemon=True).start()
+        self._run_async(
+            self._apply_dns_thread,
+            lambda result: self._verify_dns_and_rollback(*result),
+            selected,
+            start_apply_time,
+            on_error=self._on_apply_failed
+        )
     
     def _apply_dns_thread(self, selected, start_apply_time):
         """Apply DNS settings in background thread."""
-        success_count = 0
-        failed = []
-        
-        for index, name in selected:
-            # Create snapshot for rollback
-            self.dns_verifier.create_snapshot(index, name)
-            
-            # Apply DNS
-            if self.use_doh_var.get() and self.doh_manager.doh_supported:
-                # Apply with DoH
-                success, msg = self.doh_manager.configure_provider_doh(
-                    index,
-                    self.selected_provider.ipv4,
-                    self.selected_provider.doh_template,
-                    self.selected_provider.policy.encrypted_only,
-                    self.selected_provider.policy.autoupgrade,
-                    self.selected_provider.policy.allow_udp_fallback
-                )
-            else:
-                # Apply without DoH
-                success, msg = self.ps_adapter.set_dns_servers(
-                    index,
-                    self.selected_provider.ipv4,
-                    validate=True
-                )
+        provider = self.selected_provider
+        use_doh = self.use_doh_var.get() and self.doh_manager.doh_supported
+        
+        # Snapshots for rollback, all from one DNS query
+        self.dns_verifier.create_snapshots(selected)
+        
+        if use_doh:
+            # One script configures every interface
+            results = self.doh_manager.configure_provider_doh_bulk(
+                [(index, provider.ipv4) for index, _ in selected],
+                provider.doh_template,
+                provider.policy.encrypted_only,
+                provider.policy.autoupgrade,
+                provider.policy.allow_udp_fallback
+            )
+        else:
+            # Each interface is an independent PowerShell round trip; run them side by side
+            with ThreadPoolExecutor(max_workers=min(self.ps_adapter.max_sessions, len(selected))) as executor:
+                results = list(executor.map(
+                    lambda item: self.ps_adapter.set_dns_servers(item[0], provider.ipv4, validate=True),
+                    selected
+                ))
             
-            if success:
-                success_count += 1
-            else:
-                failed.append((name, msg))
+        success_count = sum(1 for success, _ in results if success)
+        failed = [(name, msg) for (_, name), (success, msg) in zip(selected, results) if not success]
         
         # Flush cache if requested
         if self.flush_cache_var.get():
@@ -488,14 +671,14 @@ class DNSChangerApp(ctk.CTk):
             
         apply_duration_ms = (time.time() - start_apply_time) * 1000
         
-        # Verify DNS
-        self.after(0, lambda: self._verify_dns_and_rollback(selected, success_count, failed, apply_duration_ms))
+        # Verify DNS here too, so the resolution tests don't block the UI
+        result = self.dns_verifier.verify_dns() if success_count > 0 else None
     
-    def _verify_dns_and_rollback(self, selected, success_count, failed, apply_duration_ms):
-        """Verify DNS and setup rollback timer."""
-        if success_count > 0:
-            result = self.dns_verifier.verify_dns()
+        return selected, success_count, failed, apply_duration_ms, result
             
+    def _verify_dns_and_rollback(self, selected, success_count, failed, apply_duration_ms, result):
+        """Report the verification result and setup rollback timer."""
+        if result is not None:
             if result.is_successful:
                 total_time = apply_duration_ms + result.duration_ms
                 msg = (f"✓ DNS applied to {success_count} interface(s).\n"
@@ -506,9 +689,9 @@ class DNSChangerApp(ctk.CTk):
                     f"⚠️ DNS applied but verification failed. Auto-rollback in 30s...",
                     WARNING_COLOR
                 )
-                # Setup rollback timer
-                self.rollback_timer = threading.Timer(30, self._auto_rollback, args=(selected,))
-                self.rollback_timer.start()
+                # Setup rollback timer on the Tk event loop, no extra thread waits for it
+                self._rollback_selected = selected
+                self._rollback_job = self.after(self.ROLLBACK_DELAY_MS, self._auto_rollback, selected)
         
         if failed:
             error_msg = "\n".join([f"{name}: {msg}" for name, msg in failed])
@@ -517,13 +700,37 @@ class DNSChangerApp(ctk.CTk):
         self.apply_btn.configure(state="normal")
         self._update_current_status()
     
+    def _on_apply_failed(self, error: Exception):
+        """Re-enable applying after the background apply raised."""
+        self._update_status(f"❌ Failed to apply DNS settings: {error}", ERROR_COLOR)
+        self.apply_btn.configure(state="normal")
+        self._update_current_status()
+    
     def _auto_rollback(self, selected):
         """Auto rollback after verification failure."""
+        self._rollback_job = None
+        self._run_async(
+            self._rollback_interfaces,
+            self._on_rollback_done,
+            selected,
+            on_error=lambda e: self._update_status(f"❌ Auto-rollback failed: {e}", ERROR_COLOR)
+        )
+    
+    def _rollback_interfaces(self, selected):
+        """Restore the DNS snapshots of the interfaces (worker thread)."""
         for index, name in selected:
             self.dns_verifier.rollback(index)
-        
-        self.after(0, lambda: self._update_status("DNS rolled back to previous settings", WARNING_COLOR))
-        self.after(0, self._update_current_status)
+    
+    def _on_rollback_done(self, _):
+        """Report a completed auto rollback."""
+        self._update_status("DNS rolled back to previous settings", WARNING_COLOR)
+        self._update_current_status()
+    
+    def _cancel_rollback(self):
+        """Cancel a pending auto rollback, if any."""
+        if self._rollback_job is not None:
+            self.after_cancel(self._rollback_job)
+            self._rollback_job = None
     
     def _reset_dns(self):
         """Reset DNS to DHCP."""
@@ -536,17 +743,25 @@ class DNSChangerApp(ctk.CTk):
         if not messagebox.askyesno("Confirm", f"Reset {len(selected)} interface(s) to DHCP?"):
             return
         
-        success_count = 0
-        for index, name in selected:
-            success, msg = self.ps_adapter.reset_dns(index)
-            if success:
-                success_count += 1
+        self._update_status("Resetting DNS settings...", TEXT_COLOR)
+        self._run_async(self._reset_dns_thread, self._on_dns_reset, selected)
+        
+    def _reset_dns_thread(self, selected):
+        """Reset DNS of the selected interfaces in background thread."""
+        with ThreadPoolExecutor(max_workers=min(self.ps_adapter.max_sessions, len(selected))) as executor:
+            results = list(executor.map(self.ps_adapter.reset_dns, [index for index, _ in selected]))
         
+        return sum(1 for success, _ in results if success)
+    
+    def _on_dns_reset(self, success_count):
+        """Report the reset result."""
         self._update_status(f"Reset {success_count} interface(s) to DHCP", SUCCESS_COLOR)
         self._update_current_status()
     
     def _show_migration_dialog(self):
         """Show migration dialog."""
+        from core.migration import can_migrate
+        
         can_mig, msg = can_migrate(
             Path.cwd() / "dns_list.txt",
             Path.cwd() / "dns_providers.yaml"
@@ -561,6 +776,8 @@ class DNSChangerApp(ctk.CTk):
     
     def _migrate_legacy_file(self):
         """Migrate legacy dns_list.txt to YAML."""
+        from core.migration import migrate_txt_to_yaml
+        
         success, msg = migrate_txt_to_yaml(
             Path.cwd() / "dns_list.txt",
             Path.cwd() / "dns_providers.yaml",
@@ -574,12 +791,9 @@ class DNSChangerApp(ctk.CTk):
             messagebox.showerror("Error", msg)
     
     def _get_selected_interfaces(self):
-        """Get list of selected interfaces."""
-        selected = []
-        for index, (var, name) in self.interface_vars.items():
-            if var.get() != "off":
-                selected.append((index, name))
-        return selected
+        """Get list of selected interfaces, in list order (no Tcl variable reads)."""
+        selected = self._selected_indexes
+        return [(index, name) for index, (_, name) in self.interface_vars.items() if index in selected]
     
     def _update_status(self, message: str, color: str):
         """Update status label."""